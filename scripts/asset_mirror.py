@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Offline Asset Mirroring for Scraped Docs
+
+Downloads the images referenced by scraped articles and stores each one
+under a content-hash filename in the assets directory, so an image used
+on several pages (or served from several URLs) is written once. Article
+HTML is rewritten to point at the local copies. Downloads go through the
+scraper's fetch path, so they share its connection pool, rate limiter,
+retries and conditional-GET cache.
+"""
+
+import hashlib
+import posixpath
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from urllib.parse import urlparse
+
+from output_writer import publish
+
+ASSETS_DIR_NAME = "assets"
+
+CONTENT_TYPE_EXTENSIONS = {
+    'image/png': '.png',
+    'image/jpeg': '.jpg',
+    'image/gif': '.gif',
+    'image/svg+xml': '.svg',
+    'image/webp': '.webp',
+    'image/avif': '.avif',
+    'image/x-icon': '.ico',
+}
+IMAGE_EXTENSIONS = set(CONTENT_TYPE_EXTENSIONS.values()) | {'.jpeg'}
+
+
+class AssetMirror:
+    """Mirror article images into a content-addressed local directory"""
+
+    def __init__(self, fetch, cache, assets_dir, max_bytes=None, workers=4):
+        self.fetch = fetch
+        self.cache = cache
+        self.assets_dir = Path(assets_dir)
+        self.assets_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.executor = ThreadPoolExecutor(max_workers=max(1, workers))
+        self.downloads = {}
+        self.reserved = {}
+        self.written = set()
+        self.lock = threading.Lock()
+        self.stats = {'downloaded': 0, 'not_modified': 0, 'deduplicated': 0,
+                      'over_budget': 0, 'failed': 0, 'bytes': 0}
+
+    def localize(self, article):
+        """Point the article's remote images at local copies, downloading any not mirrored yet"""
+        images = [img for img in article.find_all('img', src=True)
+                  if urlparse(img['src']).scheme in ('http', 'https')]
+
+        # Queue every image first so one page's downloads run concurrently
+        pending = [(img, self.submit(img['src'])) for img in images]
+        for img, future in pending:
+            filename = future.result()
+            if filename:
+                img['src'] = f"{ASSETS_DIR_NAME}/{filename}"
+
+    def submit(self, url):
+        """Start mirroring a URL unless it is already in flight or done"""
+        with self.lock:
+            future = self.downloads.get(url)
+            if future is None:
+                future = self.downloads[url] = self.executor.submit(self.mirror, url)
+        return future
+
+    def mirror(self, url):
+        """Download one asset and return its local filename, or None to keep the remote URL"""
+        cached = self.cache.get(url) if self.cache else None
+        if cached and not (self.assets_dir / cached.get('path', '')).is_file():
+            cached = None  # The local copy is gone, so a 304 would not help
+
+        try:
+            response = self.fetch(url, headers=self.cache.conditional_headers(cached) if cached else None)
+        except Exception as e:
+            print(f"Could not mirror {url}: {e}")
+            self.count('failed')
+            return None
+
+        if response.status_code == 304:
+            filename = cached['path']
+            if not self.reserve(filename, (self.assets_dir / filename).stat().st_size):
+                return None
+            self.count('not_modified')
+            return filename
+
+        data = response.content
+        digest = hashlib.sha256(data).hexdigest()
+        filename = digest[:32] + self.extension(url, response.headers.get('Content-Type', ''))
+        if not self.reserve(filename, len(data)):
+            return None
+
+        # Identical bytes from another URL, or from an earlier run, are stored already
+        path = self.assets_dir / filename
+        with self.lock:
+            new_file = filename not in self.written and not path.exists()
+            self.written.add(filename)
+        if new_file:
+            publish(path, data)
+            self.count('downloaded')
+        else:
+            self.count('deduplicated')
+
+        if self.cache:
+            self.cache.update(url, {
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
+                'sha256': digest,
+                'path': filename,
+            })
+        return filename
+
+    def reserve(self, filename, size):
+        """Count a file against the size budget once; False when it does not fit"""
+        with self.lock:
+            if filename in self.reserved:
+                return True
+            if self.max_bytes is not None and self.stats['bytes'] + size > self.max_bytes:
+                self.stats['over_budget'] += 1
+                return False
+            self.reserved[filename] = size
+            self.stats['bytes'] += size
+            return True
+
+    def extension(self, url, content_type):
+        """File extension for an asset, from its URL or else its content type"""
+        extension = posixpath.splitext(urlparse(url).path)[1].lower()
+        if extension in IMAGE_EXTENSIONS:
+            return extension
+        return CONTENT_TYPE_EXTENSIONS.get(content_type.split(';')[0].strip().lower(), '')
+
+    def count(self, stat):
+        """Increment a mirroring statistic from any worker thread"""
+        with self.lock:
+            self.stats[stat] += 1
+
+    def close(self):
+        """Wait for outstanding downloads and report what was mirrored"""
+        self.executor.shutdown(wait=True)
+        budget = f" of {self.max_bytes} byte budget" if self.max_bytes is not None else ""
+        print(f"Assets: {len(self.reserved)} files, {self.stats['bytes']} bytes{budget} "
+              f"({self.stats['downloaded']} downloaded, {self.stats['not_modified']} not modified, "
+              f"{self.stats['deduplicated']} duplicates, {self.stats['over_budget']} over budget, "
+              f"{self.stats['failed']} failed)")
@@ -0,0 +1,370 @@
+#!/usr/bin/env python3
+"""
+Benchmark Suite for the Docs Preprocessing Pipeline
+
+Times the parse, extract, format and write stages of HTMLToTextConverter
+and the KonvaJSDocScraper extractors against the checked-in
+external_context corpus plus synthetic large and deeply nested pages.
+format_tree times the formatter's walk over each article on its own,
+since a saved page's body is flattened rather than walked.
+Fetches go to a local HTTP stand-in, so no network access is needed.
+Results are written as JSON so runs can be compared with --compare.
+"""
+
+import argparse
+import contextlib
+import html
+import http.server
+import io
+import json
+import platform
+import re
+import statistics
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from html_to_text import HTMLToTextConverter, normalize_short_text
+from parser_backend import PARSER_PREFERENCE, make_soup, resolve_parser
+from scrape_konvajs import KonvaJSDocScraper
+
+DEFAULT_CORPUS = Path(__file__).resolve().parent.parent / "external_context" / "konva_docs" / "html"
+
+
+class StandInServer:
+    """Serve a fixed set of pages from a local HTTP server in a background thread"""
+
+    def __init__(self, pages):
+        # A page is its HTML, or a callable taking the request headers and
+        # returning (status, headers, html) for scripted responses such as 304s
+        pages = {path: body.encode('utf-8') if isinstance(body, str) else body for path, body in pages.items()}
+        self.requests = []
+        requests = self.requests
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                requests.append((time.monotonic(), self.path, dict(self.headers)))
+                page = pages.get(self.path)
+                status, headers, body = 200, {}, page
+                if callable(page):
+                    status, headers, body = page(self.headers)
+                    body = body.encode('utf-8')
+                elif page is None:
+                    status, body = 404, b''
+                self.send_response(status)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # Keep benchmark output clean
+
+        self.server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/docs/"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def saved_page(title, url, content):
+    """Wrap content the way save_page_content does, minus the stylesheet"""
+    return f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <title>{title} - KonvaJS Documentation</title>
+</head>
+<body>
+    <div class="source-url">
+        <strong>Source:</strong> <a href="{url}" target="_blank">{url}</a>
+    </div>
+    {content}
+</body>
+</html>"""
+
+
+def synthetic_large_page(corpus_pages, copies=4):
+    """Build one very large page by repeating every corpus article"""
+    articles = []
+    for content in corpus_pages.values():
+        start = content.find('<article')
+        end = content.rfind('</article>')
+        if start != -1 and end != -1:
+            articles.append(content[start + len('<article>'):end])
+    body = "<article>" + "".join(articles * copies) + "</article>"
+    return saved_page("Synthetic Large", "https://konvajs.org/docs/synthetic-large.html", body)
+
+
+def synthetic_nested_page(depth=400):
+    """Build a page of deeply nested containers, lists and tables"""
+    opening = []
+    closing = []
+    for level in range(depth):
+        tag = ('div', 'section', 'article', 'main')[level % 4]
+        opening.append(
+            f"<{tag}><h3>Level {level}</h3><p>Paragraph with <code>code</code> "
+            f"and <a href=\"/docs/{level}.html\">a link</a>.</p>"
+            f"<ul><li>item <b>{level}</b><ul><li>nested</li></ul></li></ul>"
+            f"<table><tr><th>key</th><th>value</th></tr><tr><td>{level}</td><td>x &amp; y</td></tr></table>"
+        )
+        closing.append(f"</{tag}>")
+    body = "".join(opening) + "".join(reversed(closing))
+    return saved_page("Synthetic Nested", "https://konvajs.org/docs/synthetic-nested.html", body)
+
+
+def sidebar_page(filenames):
+    """Build a docs landing page whose sidebar links to every page"""
+    links = "".join(f'<li><a href="/docs/{name}.html">{name}</a></li>' for name in filenames)
+    return f'<html><body><nav aria-label="Docs sidebar"><ul>{links}</ul></nav></body></html>'
+
+
+def timed(timings, stage, func, *args):
+    """Call func, adding its wall-clock time to the stage total"""
+    start = time.perf_counter()
+    result = func(*args)
+    timings[stage] = timings.get(stage, 0.0) + time.perf_counter() - start
+    return result
+
+
+def bench_converter(converter, pages, out_dir):
+    """Time one conversion pass over the pages, stage by stage"""
+    timings = {}
+    for name, content in pages.items():
+        soup = timed(timings, 'parse', make_soup, content, converter.parser)
+        # convert_soup adds its own extract and format times to the same dict
+        text = converter.convert_soup(soup, timings)
+        timed(timings, 'write', (out_dir / f"{name}.txt").write_text, text, 'utf-8')
+
+        # A saved page's body is flattened with one get_text(), so the
+        # formatter's walk over nested containers is timed on the article
+        content_root = soup.find(['article', 'main'])
+        if content_root is not None:
+            timed(timings, 'format_tree', converter.extract_text_with_formatting, content_root)
+    return timings
+
+
+def bench_scraper(scraper, pages, base_url, out_dir):
+    """Time one scrape pass over the pages served by the stand-in"""
+    scraper.output_dir = out_dir
+    timings = {}
+
+    landing = timed(timings, 'fetch', lambda: scraper.fetch(base_url).text)
+    timed(timings, 'sidebar', scraper.extract_sidebar_links, landing)
+
+    for name in pages:
+        url = f"{base_url}{name}.html"
+        html_content = timed(timings, 'fetch', lambda: scraper.fetch(url).text)
+        article = scraper.extract_article_element(html_content, url)
+        if article is None:
+            continue
+        content = timed(timings, 'serialize', str, article)
+        timed(timings, 'write', scraper.save_page_content, content, name, name, url)
+    timed(timings, 'write', scraper.writer.flush)
+
+    # extract_article_element records parse and extract in the scraper's own metrics
+    for stage in ('parse', 'extract'):
+        timings[stage] = scraper.metrics.stages.get(stage, {}).get('total_seconds', 0.0)
+    return timings
+
+
+def regex_clean_text(text):
+    """The original regex-based clean_text, kept as the micro-benchmark baseline"""
+    if not text:
+        return ""
+    text = html.unescape(text)
+    text = re.sub(r'\s+', ' ', text)
+    return text.strip()
+
+
+def clean_text_fragments(converter, pages):
+    """Record every string clean_text sees while converting the pages"""
+    fragments = []
+    clean_text = converter.clean_text
+    
+    def recording_clean_text(text):
+        fragments.append(text)
+        return clean_text(text)
+    
+    converter.clean_text = recording_clean_text
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            bench_converter(converter, pages, Path(tmp))
+    finally:
+        del converter.clean_text
+    return fragments
+
+
+def run_clean_text_case(pages, parser, repeat):
+    """Micro-benchmark clean_text against the regex baseline on the corpus fragments"""
+    with tempfile.TemporaryDirectory() as tmp:
+        converter = HTMLToTextConverter(tmp, Path(tmp) / "text", parser=parser)
+        fragments = clean_text_fragments(converter, pages)
+        
+        mismatches = sum(1 for text in fragments if converter.clean_text(text) != regex_clean_text(text))
+        if mismatches:
+            raise AssertionError(f"clean_text differs from the baseline on {mismatches} fragments")
+        
+        print(f"Benchmarking clean_text: {len(fragments)} fragments, "
+              f"{sum(len(text) for text in fragments)} characters")
+        samples = []
+        for _ in range(repeat):
+            timings = {}
+            timed(timings, 'regex_baseline', lambda: [regex_clean_text(text) for text in fragments])
+            # Start each pass cold so the cache only helps within one corpus run
+            normalize_short_text.cache_clear()
+            timed(timings, 'clean_text', lambda: [converter.clean_text(text) for text in fragments])
+            samples.append(timings)
+    
+    result = summarize(samples)
+    speedup = result['regex_baseline']['median'] / result['clean_text']['median']
+    print(f"clean_text: {speedup:.1f}x faster than the regex baseline")
+    return {
+        'pages': len(pages),
+        'bytes': sum(len(content.encode('utf-8')) for content in pages.values()),
+        'fragments': len(fragments),
+        'converter': result,
+    }
+
+
+def summarize(samples):
+    """Reduce per-repeat stage timings to summary statistics"""
+    summary = {}
+    for stage in samples[0]:
+        values = [sample[stage] for sample in samples]
+        summary[stage] = {
+            'min': min(values),
+            'median': statistics.median(values),
+            'mean': statistics.mean(values),
+        }
+    return summary
+
+
+def run_case(name, pages, parser, repeat):
+    """Benchmark the converter and scraper on one set of pages"""
+    print(f"Benchmarking {name}: {len(pages)} pages, "
+          f"{sum(len(content) for content in pages.values())} bytes")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        served = {f"/docs/{page}.html": content for page, content in pages.items()}
+        served["/docs/"] = sidebar_page(pages)
+
+        with StandInServer(served) as server:
+            converter_samples = []
+            scraper_samples = []
+            for i in range(repeat):
+                # Fresh output directories and scraper each pass: unchanged files are
+                # skipped on rewrite, and the scraper's metrics must cover one pass
+                converter = HTMLToTextConverter(tmp, tmp / f"text-{i}", parser=parser)
+                converter_samples.append(bench_converter(converter, pages, converter.output_dir))
+
+                # The scraper reports every save; keep the benchmark log readable
+                with contextlib.redirect_stdout(io.StringIO()):
+                    scraper = KonvaJSDocScraper(output_dir=tmp / f"html-{i}", workers=1, requests_per_second=0,
+                                                use_cache=False, parser=parser)
+                    scraper_samples.append(bench_scraper(scraper, pages, server.base_url, scraper.output_dir))
+                    scraper.writer.close()
+
+    return {
+        'pages': len(pages),
+        'bytes': sum(len(content.encode('utf-8')) for content in pages.values()),
+        'converter': summarize(converter_samples),
+        'scraper': summarize(scraper_samples),
+    }
+
+
+def compare(previous, current):
+    """Print the median change of every stage against a previous run"""
+    print(f"\nComparison against {previous.get('timestamp', 'previous run')}:")
+    for case, result in current['cases'].items():
+        old_case = previous.get('cases', {}).get(case)
+        if not old_case:
+            continue
+        if old_case.get('bytes') != result['bytes']:
+            print(f"  {case}: input size changed ({old_case.get('bytes')} -> {result['bytes']} bytes), skipping")
+            continue
+        for component in ('converter', 'scraper'):
+            for stage, stats in result.get(component, {}).items():
+                old_stats = old_case.get(component, {}).get(stage)
+                if not old_stats or not old_stats['median']:
+                    continue
+                ratio = stats['median'] / old_stats['median']
+                flag = "  <-- slower" if ratio > 1.1 else ""
+                print(f"  {case:>10} {component:>9} {stage:>13}: {old_stats['median'] * 1000:9.2f} ms -> "
+                      f"{stats['median'] * 1000:9.2f} ms ({ratio:.2f}x){flag}")
+
+
+def main():
+    """Main function to run the benchmarks"""
+    parser = argparse.ArgumentParser(description="Benchmark the docs preprocessing pipeline")
+    parser.add_argument("--corpus", default=str(DEFAULT_CORPUS),
+                        help="Directory of scraped HTML pages to benchmark")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="Number of timed passes per case")
+    parser.add_argument("--parser", default="auto", choices=["auto"] + PARSER_PREFERENCE,
+                        help="HTML parser backend to benchmark")
+    parser.add_argument("--cases", default="corpus,large,nested",
+                        help="Comma-separated cases to run (corpus, large, nested, clean_text)")
+    parser.add_argument("--output", default=None,
+                        help="Write the JSON results to this file instead of stdout")
+    parser.add_argument("--compare", default=None,
+                        help="Previous JSON results to compare against")
+    args = parser.parse_args()
+
+    corpus_pages = {
+        path.stem: path.read_text(encoding='utf-8')
+        for path in sorted(Path(args.corpus).glob("*.html"))
+        if path.name != 'index.html'
+    }
+    cases = {
+        'corpus': lambda: corpus_pages,
+        'large': lambda: {'synthetic-large': synthetic_large_page(corpus_pages)},
+        'nested': lambda: {'synthetic-nested': synthetic_nested_page()},
+    }
+
+    parser_name = resolve_parser(args.parser)
+    results = {
+        'timestamp': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'parser': parser_name,
+        'repeat': args.repeat,
+        'cases': {},
+    }
+    for case in args.cases.split(','):
+        if case == 'clean_text':
+            results['cases'][case] = run_clean_text_case(corpus_pages, parser_name, args.repeat)
+            continue
+        results['cases'][case] = run_case(case, cases[case](), parser_name, args.repeat)
+
+    report = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(report)
+        print(f"Results saved to: {args.output}")
+    else:
+        print(report)
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            compare(json.load(f), results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Crawl Frontier for the KonvaJS Docs Scraper
+
+Keeps track of the documentation pages found so far, the link depth at
+which each was found and the filename it is saved under. URLs are
+normalized before they are queued, so a page reached with a fragment,
+different host casing or a trailing slash is crawled once. Pages are
+handed out one breadth-first level at a time, and the frontier can be
+snapshotted into the scraper's crawl checkpoint and rebuilt from it.
+"""
+
+import posixpath
+import xml.etree.ElementTree as ElementTree
+from urllib.parse import urlparse, urlunparse, parse_qsl, urlencode
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+# Extensions that are pages; anything else under /docs/ is an asset
+PAGE_EXTENSIONS = {'', '.html', '.htm'}
+
+# Filenames the scraper writes itself
+RESERVED_FILENAMES = {'index'}
+
+
+def normalize_url(url):
+    """Canonical form of a URL: no fragment, lowercase host, no default port, sorted query"""
+    parts = urlparse(url)
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+
+    path = parts.path or '/'
+    # Collapse duplicate slashes and dot segments, keeping a trailing slash
+    normalized_path = posixpath.normpath(path)
+    if path.endswith('/') and normalized_path != '/':
+        normalized_path += '/'
+    if normalized_path.startswith('//'):
+        normalized_path = '/' + normalized_path.lstrip('/')
+
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunparse((scheme, host, normalized_path, '', query, ''))
+
+
+def url_key(url):
+    """Identity of a page for deduplication; /docs/page and /docs/page/ are the same page"""
+    normalized = normalize_url(url)
+    parts = urlparse(normalized)
+    if parts.path != '/':
+        normalized = urlunparse(parts._replace(path=parts.path.rstrip('/')))
+    return normalized
+
+
+def parse_sitemap(xml_text):
+    """Return (page URLs, nested sitemap URLs) listed in a sitemap or sitemap index"""
+    root = ElementTree.fromstring(xml_text)
+    locations = [
+        element.text.strip() for element in root.iter()
+        if element.tag.endswith('loc') and element.text
+    ]
+    # Tags carry the sitemap namespace, e.g. {http://www.sitemaps.org/...}urlset
+    if root.tag.endswith('sitemapindex'):
+        return [], locations
+    return locations, []
+
+
+class CrawlFrontier:
+    """Deduplicated, depth-bounded breadth-first queue of documentation pages"""
+
+    def __init__(self, base_url, max_depth=0):
+        self.base_url = normalize_url(base_url)
+        self.max_depth = max_depth
+        self.entries = []
+        self.by_key = {}
+        self.filenames = set(RESERVED_FILENAMES)
+
+        base = urlparse(self.base_url)
+        self.scope_host = base.netloc
+        self.scope_path = base.path if base.path.endswith('/') else posixpath.dirname(base.path) + '/'
+
+    def in_scope(self, url):
+        """Check whether a URL is a docs page under the base URL"""
+        parts = urlparse(normalize_url(url))
+        if parts.scheme not in DEFAULT_PORTS or parts.netloc != self.scope_host:
+            return False
+        if not parts.path.startswith(self.scope_path):
+            return False
+        return posixpath.splitext(parts.path)[1].lower() in PAGE_EXTENSIONS
+
+    def filename_for_url(self, url):
+        """Derive a filename from a URL's path below the docs root, e.g. shapes/Rect.html -> shapes-Rect"""
+        path = urlparse(normalize_url(url)).path
+        relative = path[len(self.scope_path):] if path.startswith(self.scope_path) else path
+        relative = posixpath.splitext(relative.strip('/'))[0]
+        return relative.replace('/', '-') or 'docs-home'
+
+    def unique_filename(self, filename):
+        """Suffix a filename so two different pages never share an output file"""
+        candidate = filename or 'page'
+        suffix = 2
+        while candidate in self.filenames:
+            candidate = f"{filename}-{suffix}"
+            suffix += 1
+        self.filenames.add(candidate)
+        return candidate
+
+    def add(self, url, title, depth, filename):
+        """Queue a page unless it is already known or too deep; return its link info if queued"""
+        if depth > self.max_depth:
+            return None
+
+        key = url_key(url)
+        if key in self.by_key:
+            return None
+
+        link_info = {
+            'url': normalize_url(url),
+            'title': title,
+            'filename': self.unique_filename(filename),
+            'depth': depth,
+        }
+        self.by_key[key] = link_info
+        self.entries.append(link_info)
+        return link_info
+
+    def to_state(self):
+        """Serialisable snapshot of the frontier"""
+        return {'base_url': self.base_url, 'max_depth': self.max_depth, 'entries': self.entries}
+
+    @classmethod
+    def from_state(cls, state, max_depth=None):
+        """Rebuild a frontier from a snapshot, optionally with a new depth limit"""
+        frontier = cls(state['base_url'], state['max_depth'] if max_depth is None else max_depth)
+        for link_info in state['entries']:
+            key = url_key(link_info['url'])
+            if key in frontier.by_key:
+                continue
+            frontier.by_key[key] = link_info
+            frontier.filenames.add(link_info['filename'])
+            frontier.entries.append(link_info)
+        return frontier
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Chunked Corpus Output for LLM Context Loading
+
+Splits converted documentation text at its headings into size-bounded
+chunks. The headings come from the outline HTMLToTextConverter records
+from the HTML tree, since a flattened page body keeps them inline, or
+failing that from the Markdown-style heading lines in the text. Every
+chunk carries its source URL, page title and heading path. All chunks go
+into one JSONL file with a byte-offset index beside it, so a reader can
+memory-map the file and load only the chunks it needs.
+"""
+
+import json
+import mmap
+import re
+from pathlib import Path
+
+from output_writer import publish
+
+HEADING_PATTERN = re.compile(r'^(#{1,6}) (.+)$')
+HEADING_LINE_PATTERN = re.compile(r'^#{1,6} ', re.MULTILINE)
+FENCE_PATTERN = re.compile(r'^```')
+
+# Rough tokens-per-character ratio for English prose and code
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text):
+    """Approximate the token count of a piece of text"""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def heading_label(text):
+    """Heading text without the zero-width space doc sites append as an anchor link"""
+    return text.strip().strip('\u200b').strip()
+
+
+def nest_heading(stack, level, text):
+    """Push a heading onto the (level, text) stack, closing those at its level or deeper; return the path"""
+    while stack and stack[-1][0] >= level:
+        stack.pop()
+    stack.append((level, heading_label(text)))
+    return [label for _, label in stack]
+
+
+def parse_text_document(text):
+    """Split a converted page into its title, source URL and body"""
+    lines = text.split('\n')
+    title = lines[0] if lines else ""
+    body_start = 3 if len(lines) > 1 and set(lines[1]) == {'='} else 0
+    source_url = ""
+    if len(lines) > body_start and lines[body_start].startswith("Source: "):
+        source_url = lines[body_start][len("Source: "):]
+        body_start += 2
+    return title, source_url, '\n'.join(lines[body_start:])
+
+
+class DocChunker:
+    """Split converted docs into heading-aligned chunks under a token budget"""
+
+    def __init__(self, max_tokens=512):
+        self.max_tokens = max_tokens
+        self.max_chars = max_tokens * CHARS_PER_TOKEN
+
+    def sections(self, body, headings=None):
+        """Yield (heading_path, text) for each heading-delimited section"""
+        if headings:
+            yield from self.outline_sections(body, headings)
+            return
+
+        heading_stack = []
+        heading_path = []
+        current = []
+        in_fence = False
+
+        for line in body.split('\n'):
+            if FENCE_PATTERN.match(line):
+                in_fence = not in_fence
+
+            match = None if in_fence else HEADING_PATTERN.match(line)
+            if match:
+                if '\n'.join(current).strip():
+                    yield list(heading_path), '\n'.join(current).strip()
+                current = []
+
+                heading_path = nest_heading(heading_stack, len(match.group(1)), match.group(2))
+
+            current.append(line)
+
+        if '\n'.join(current).strip():
+            yield list(heading_path), '\n'.join(current).strip()
+
+    def outline_sections(self, body, headings):
+        """Yield (heading_path, text) by locating the outline's [level, text] headings in order"""
+        # Only a flattened body, with no heading lines at all, is searched for
+        # bare heading text; elsewhere that would cut at a mention in prose
+        flattened = not HEADING_LINE_PATTERN.search(body)
+        heading_stack = []
+        heading_path = []
+        start = 0
+        position = 0
+
+        for level, heading in headings:
+            line = re.compile(rf'^{"#" * level} {re.escape(heading)}[ \t]*$', re.MULTILINE).search(body, position)
+            if line:
+                cut, position = line.start(), line.end()
+            else:
+                cut = body.find(heading, position) if flattened else -1
+                if cut < 0:
+                    continue  # Not in the text output, e.g. inside a dropped element
+                position = cut + len(heading)
+
+            if body[start:cut].strip():
+                yield list(heading_path), body[start:cut].strip()
+
+            heading_path = nest_heading(heading_stack, level, heading)
+            start = cut
+
+        if body[start:].strip():
+            yield list(heading_path), body[start:].strip()
+
+    def split_text(self, text):
+        """Split text that is over budget at paragraph, then word boundaries"""
+        if len(text) <= self.max_chars:
+            return [text]
+
+        pieces = []
+        current = ""
+        for paragraph in text.split('\n\n'):
+            candidate = f"{current}\n\n{paragraph}" if current else paragraph
+            if len(candidate) <= self.max_chars:
+                current = candidate
+                continue
+
+            if current:
+                pieces.append(current)
+            current = ""
+
+            # A single paragraph can still be too large, e.g. a flattened page
+            while len(paragraph) > self.max_chars:
+                cut = paragraph.rfind(' ', 0, self.max_chars)
+                if cut <= 0:
+                    cut = self.max_chars
+                pieces.append(paragraph[:cut].rstrip())
+                paragraph = paragraph[cut:].lstrip()
+            current = paragraph
+
+        if current:
+            pieces.append(current)
+        return pieces
+
+    def chunk_document(self, text, source_file, headings=None):
+        """Yield chunk records for one converted page, split at its outline's headings if given"""
+        title, source_url, body = parse_text_document(text)
+
+        index = 0
+        for heading_path, section in self.sections(body, headings):
+            for piece in self.split_text(section):
+                yield {
+                    'id': f"{Path(source_file).stem}#{index}",
+                    'source_file': str(source_file),
+                    'url': source_url,
+                    'title': title,
+                    'heading_path': heading_path,
+                    'tokens': estimate_tokens(piece),
+                    'text': piece,
+                }
+                index += 1
+
+    def write_chunks(self, text_files, jsonl_path, index_path, outlines=None):
+        """Stream chunks from the text files into a JSONL file and its offset index"""
+        jsonl_path = Path(jsonl_path)
+        entries = []
+        publish(jsonl_path, self.chunk_lines(text_files, outlines or {}, entries))
+        publish(index_path, json.dumps(
+            {'chunks_file': jsonl_path.name, 'max_tokens': self.max_tokens, 'chunks': entries}, indent=1
+        ))
+
+        print(f"Created {len(entries)} chunks: {jsonl_path}")
+        return entries
+
+    def chunk_lines(self, text_files, outlines, entries):
+        """Yield the encoded JSONL lines, recording each chunk's offset in entries"""
+        # outlines maps a text filename to its heading outline from the converter
+        offset = 0
+        for text_file in text_files:
+            with open(text_file, 'r', encoding='utf-8', newline='') as f:
+                text = f.read()
+
+            name = Path(text_file).name
+            for chunk in self.chunk_document(text, name, outlines.get(name)):
+                line = (json.dumps(chunk, ensure_ascii=False) + "\n").encode('utf-8')
+                entries.append({
+                    'id': chunk['id'],
+                    'offset': offset,
+                    'length': len(line),
+                    'source_file': chunk['source_file'],
+                    'url': chunk['url'],
+                    'heading_path': chunk['heading_path'],
+                    'tokens': chunk['tokens'],
+                })
+                offset += len(line)
+                yield line
+
+
+class ChunkReader:
+    """Read individual chunks from a JSONL file through its offset index"""
+
+    def __init__(self, index_path):
+        index_path = Path(index_path)
+        with open(index_path, 'r', encoding='utf-8') as f:
+            self.index = json.load(f)
+        self.entries = {entry['id']: entry for entry in self.index['chunks']}
+        self.file = open(index_path.with_name(self.index['chunks_file']), 'rb')
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ) if self.entries else None
+
+    def get(self, chunk_id):
+        """Load one chunk without reading the rest of the file"""
+        entry = self.entries[chunk_id]
+        return json.loads(self.map[entry['offset']:entry['offset'] + entry['length']])
+
+    def close(self):
+        """Release the memory map and file handle"""
+        if self.map is not None:
+            self.map.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Boilerplate Deduplication for the Combined Docs Corpus
+
+Docs pages repeat blocks such as footers, sandbox links and shared demo
+code. DocDeduplicator fingerprints the paragraphs and code blocks of every
+converted page, and writes blocks that recur on several pages once, in a
+shared section at the top of the combined file. Each page then refers to
+them by id.
+
+Pages flattened into a single long line have no paragraph breaks to line
+up on. Their text is cut at content-defined boundaries picked by a rolling
+hash over words, so a repeated span gets the same fragments wherever it
+appears on a page.
+"""
+
+import hashlib
+import json
+import re
+import zlib
+from pathlib import Path
+
+from output_writer import publish
+
+# Fenced code blocks are fingerprinted whole; other text splits at blank lines
+FENCED_BLOCK_PATTERN = re.compile(r'^```\n.*?\n```$', re.MULTILINE | re.DOTALL)
+PARAGRAPH_BREAK_PATTERN = re.compile(r'\n\s*\n')
+WORD_PATTERN = re.compile(r'\S+\s*')
+
+# Rolling hash over word hashes: a boundary falls after a word when the hash
+# of the last WINDOW_WORDS words has its low bits clear (~1 cut per 16 words)
+WINDOW_WORDS = 6
+BOUNDARY_MASK = 0x0F
+MIN_FRAGMENT_WORDS = 8
+HASH_BASE = 257
+HASH_MODULUS = (1 << 61) - 1
+
+# Blocks shorter than this cost about as much to reference as to repeat
+MIN_SHARED_BYTES = 64
+MIN_SHARED_PAGES = 2
+
+
+def fingerprint(text):
+    """Fingerprint a fragment, ignoring the whitespace around it"""
+    return hashlib.blake2b(text.strip().encode('utf-8'), digest_size=16).hexdigest()
+
+
+def content_defined_spans(text, start, end):
+    """Yield (start, end) cuts of text[start:end] at rolling-hash boundaries"""
+    words = [match.span() for match in WORD_PATTERN.finditer(text, start, end)]
+    if len(words) < 2 * MIN_FRAGMENT_WORDS:
+        yield start, end
+        return
+
+    drop_factor = pow(HASH_BASE, WINDOW_WORDS, HASH_MODULUS)
+    window = []
+    rolling = 0
+    fragment_start = start
+    fragment_words = 0
+
+    for word_start, word_end in words:
+        # crc32 is stable across runs, unlike hash() on str
+        word_hash = zlib.crc32(text[word_start:word_end].rstrip().encode('utf-8'))
+        window.append(word_hash)
+        rolling = (rolling * HASH_BASE + word_hash) % HASH_MODULUS
+        if len(window) > WINDOW_WORDS:
+            rolling = (rolling - window.pop(0) * drop_factor) % HASH_MODULUS
+        fragment_words += 1
+
+        if fragment_words >= MIN_FRAGMENT_WORDS and rolling & BOUNDARY_MASK == 0:
+            yield fragment_start, word_end
+            fragment_start = word_end
+            fragment_words = 0
+
+    if fragment_start < end:
+        yield fragment_start, end
+
+
+def fragment_spans(text):
+    """Split a page into (start, end, kind) spans that concatenate back to the text"""
+    position = 0
+    for code in FENCED_BLOCK_PATTERN.finditer(text):
+        yield from prose_spans(text, position, code.start())
+        yield code.start(), code.end(), 'code'
+        position = code.end()
+    yield from prose_spans(text, position, len(text))
+
+
+def prose_spans(text, start, end):
+    """Split prose into paragraphs, keeping each blank-line break with the paragraph before it"""
+    position = start
+    for separator in PARAGRAPH_BREAK_PATTERN.finditer(text, start, end):
+        # A break right after a code block stays with the next paragraph
+        if separator.start() > position:
+            yield position, separator.end(), 'paragraph'
+            position = separator.end()
+    if position < end:
+        yield position, end, 'paragraph'
+
+
+class DocDeduplicator:
+    """Find boilerplate shared across converted pages and write a deduplicated combined file"""
+
+    def __init__(self, min_bytes=MIN_SHARED_BYTES, min_pages=MIN_SHARED_PAGES):
+        self.min_bytes = min_bytes
+        self.min_pages = min_pages
+
+    def pieces(self, text, shared):
+        """Yield (text, fingerprint) pieces of a page; fingerprint is None for page-specific text"""
+        for start, end, kind in fragment_spans(text):
+            block = text[start:end]
+            block_fingerprint = fingerprint(block)
+            if kind == 'code' or block_fingerprint in shared:
+                yield block, block_fingerprint if block_fingerprint in shared else None
+                continue
+
+            for cut_start, cut_end in content_defined_spans(text, start, end):
+                fragment = text[cut_start:cut_end]
+                fragment_fingerprint = fingerprint(fragment)
+                yield fragment, fragment_fingerprint if fragment_fingerprint in shared else None
+
+    def candidate_blocks(self, text_files):
+        """Count on how many pages each paragraph, code block and fragment occurs"""
+        page_counts = {}
+        for text_file in text_files:
+            text = self.read(text_file)
+            seen = set()
+            for start, end, kind in fragment_spans(text):
+                seen.add(fingerprint(text[start:end]))
+                if kind == 'paragraph':
+                    seen.update(fingerprint(text[cut_start:cut_end])
+                                for cut_start, cut_end in content_defined_spans(text, start, end))
+            for block_fingerprint in seen:
+                page_counts[block_fingerprint] = page_counts.get(block_fingerprint, 0) + 1
+        return {key for key, count in page_counts.items() if count >= self.min_pages}
+
+    def shared_blocks(self, text_files):
+        """Pick the blocks worth sharing: long enough and still used on several pages"""
+        candidates = self.candidate_blocks(text_files)
+
+        # A fragment can recur only inside paragraphs that are shared whole,
+        # so count the uses the final layout would really make
+        uses = {}
+        for text_file in text_files:
+            for piece, block_fingerprint in self.pieces(self.read(text_file), candidates):
+                if block_fingerprint and len(piece.strip().encode('utf-8')) >= self.min_bytes:
+                    block = uses.setdefault(block_fingerprint, {'text': piece.strip(), 'pages': []})
+                    block['pages'].append(Path(text_file).name)
+
+        return {
+            block_fingerprint: block for block_fingerprint, block in uses.items()
+            if len(set(block['pages'])) >= self.min_pages
+        }
+
+    def read(self, text_file):
+        """Read one converted page"""
+        with open(text_file, 'r', encoding='utf-8', newline='') as f:
+            return f.read()
+
+    def write_combined(self, text_files, combined_path, header, separator):
+        """Write the combined file with shared blocks stored once, and return the savings report"""
+        report = {}
+        publish(combined_path, self.combined_chunks(text_files, header, separator, report))
+        return report
+
+    def combined_chunks(self, text_files, header, separator, report):
+        """Yield the encoded combined file, filling in the savings report once the last chunk is out"""
+        shared = self.shared_blocks(text_files)
+
+        # Number blocks in order of first appearance so the output is stable
+        block_ids = {}
+        for text_file in text_files:
+            for _, block_fingerprint in self.pieces(self.read(text_file), shared):
+                if block_fingerprint and block_fingerprint not in block_ids:
+                    block_ids[block_fingerprint] = f"S{len(block_ids) + 1}"
+
+        original_bytes = 0
+
+        def texts():
+            nonlocal original_bytes
+            yield header
+            if block_ids:
+                yield "Shared blocks\n" + "-" * 13 + "\n\n"
+                for block_fingerprint, block_id in block_ids.items():
+                    yield f"[{block_id}]\n{shared[block_fingerprint]['text']}\n\n"
+                yield separator.lstrip("\n")
+
+            for text_file in text_files:
+                yield "\n"
+                for piece, block_fingerprint in self.pieces(self.read(text_file), shared):
+                    original_bytes += len(piece.encode('utf-8'))
+                    if block_fingerprint:
+                        # Keep the surrounding whitespace so the page layout survives
+                        leading = piece[:len(piece) - len(piece.lstrip())]
+                        trailing = piece[len(piece.rstrip()):]
+                        piece = f"{leading}[shared block {block_ids[block_fingerprint]}]{trailing}"
+                    yield piece
+                yield separator
+
+        written_bytes = 0
+        for text in texts():
+            data = text.encode('utf-8')
+            written_bytes += len(data)
+            yield data
+
+        # Bytes the combined file would take without deduplication
+        original_bytes += len(header.encode('utf-8')) + len(text_files) * (1 + len(separator.encode('utf-8')))
+        report.update({
+            'pages': len(text_files),
+            'shared_blocks': len(block_ids),
+            'original_bytes': original_bytes,
+            'deduplicated_bytes': written_bytes,
+            'bytes_saved': original_bytes - written_bytes,
+            'blocks': [
+                {
+                    'id': block_id,
+                    'bytes': len(shared[block_fingerprint]['text'].encode('utf-8')),
+                    'occurrences': len(shared[block_fingerprint]['pages']),
+                    'pages': sorted(set(shared[block_fingerprint]['pages'])),
+                    'preview': shared[block_fingerprint]['text'][:80],
+                }
+                for block_fingerprint, block_id in block_ids.items()
+            ],
+        })
+
+    def write_report(self, report, report_path):
+        """Save the savings report as JSON, replacing the file atomically"""
+        publish(report_path, json.dumps(report, indent=2, ensure_ascii=False))
+
+        saved_percent = 100 * report['bytes_saved'] / report['original_bytes'] if report['original_bytes'] else 0
+        print(f"Deduplicated {report['shared_blocks']} shared blocks across {report['pages']} pages: "
+              f"saved {report['bytes_saved']} bytes ({saved_percent:.1f}%)")
+        print(f"Deduplication report saved to: {report_path}")
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Compressed Single-File Archive for the Docs Corpus
+
+An alternative to the loose-file layout: every page is stored as one
+independently compressed record (zstd when the zstandard package is
+installed, gzip otherwise). A fixed header points at a JSON index of
+record offsets, so a reader can memory-map the archive and decompress a
+single page without touching the rest. Pages are stored without the
+per-page HTML template, which removes the stylesheet repeated in every
+loose file.
+
+Layout:
+    header   MAGIC (8 bytes) | codec (8 bytes) | index offset (u64) | index length (u64)
+    records  compressed page bodies, back to back
+    index    UTF-8 JSON: {name: {offset, length, size, sha256, ...metadata}}
+"""
+
+import gzip
+import hashlib
+import json
+import mmap
+import os
+import struct
+from pathlib import Path
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+MAGIC = b"KDOCARC1"
+HEADER = struct.Struct("<8s8sQQ")
+
+
+def default_codec():
+    """Pick the best available compression codec"""
+    return 'zstd' if zstandard else 'gzip'
+
+
+def compress(data, codec):
+    """Compress one record"""
+    if codec == 'zstd':
+        return zstandard.ZstdCompressor(level=10).compress(data)
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def decompress(data, codec):
+    """Decompress one record"""
+    if codec == 'zstd':
+        if not zstandard:
+            raise RuntimeError("This archive uses zstd; install the zstandard package to read it")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+class ArchiveWriter:
+    """Write page records to a new archive, replacing the target atomically on close"""
+
+    def __init__(self, path, codec='auto'):
+        self.path = Path(path)
+        self.codec = default_codec() if codec == 'auto' else codec
+        if self.codec == 'zstd' and not zstandard:
+            raise RuntimeError("zstd compression needs the zstandard package")
+        self.tmp_path = self.path.with_name(self.path.name + '.tmp')
+        self.file = open(self.tmp_path, 'wb')
+        self.file.write(HEADER.pack(MAGIC, self.codec.encode('ascii'), 0, 0))
+        self.index = {}
+
+    def add(self, name, data, **metadata):
+        """Compress and append one page"""
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        self.add_compressed(name, compress(data, self.codec), dict(
+            metadata, size=len(data), sha256=hashlib.sha256(data).hexdigest()))
+
+    def add_compressed(self, name, payload, entry):
+        """Append an already-compressed record, e.g. one carried over from a previous archive"""
+        offset = self.file.tell()
+        self.file.write(payload)
+        self.index[name] = dict(entry, offset=offset, length=len(payload))
+
+    def copy_from(self, reader, name):
+        """Carry a record over from another archive without recompressing it"""
+        entry = reader.entry(name)
+        if reader.codec == self.codec:
+            self.add_compressed(name, reader.read_compressed(name), entry)
+        else:
+            metadata = {key: value for key, value in entry.items()
+                        if key not in ('offset', 'length', 'size', 'sha256')}
+            self.add(name, reader.read(name), **metadata)
+
+    def close(self):
+        """Write the index, fill in the header and publish the archive"""
+        index_bytes = json.dumps(self.index, sort_keys=True).encode('utf-8')
+        index_offset = self.file.tell()
+        self.file.write(index_bytes)
+        self.file.seek(0)
+        self.file.write(HEADER.pack(MAGIC, self.codec.encode('ascii'), index_offset, len(index_bytes)))
+        self.file.close()
+        os.replace(self.tmp_path, self.path)
+        print(f"Created archive with {len(self.index)} records: {self.path}")
+
+    def abort(self):
+        """Discard a partially written archive"""
+        self.file.close()
+        self.tmp_path.unlink(missing_ok=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc_info):
+        if exc_type:
+            self.abort()
+        else:
+            self.close()
+
+
+class ArchiveReader:
+    """Read single records from an archive through a memory map"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.file = open(self.path, 'rb')
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, codec, index_offset, index_length = HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{self.path} is not a docs archive")
+        self.codec = codec.rstrip(b"\0").decode('ascii')
+        self.index = json.loads(self.map[index_offset:index_offset + index_length])
+
+    def names(self):
+        """List the record names in the archive"""
+        return list(self.index)
+
+    def entry(self, name):
+        """Return the index entry (offsets and metadata) for a record"""
+        return self.index[name]
+
+    def read_compressed(self, name):
+        """Return the raw compressed bytes of a record"""
+        entry = self.index[name]
+        return self.map[entry['offset']:entry['offset'] + entry['length']]
+
+    def read(self, name):
+        """Decompress one record"""
+        return decompress(self.read_compressed(name), self.codec)
+
+    def read_text(self, name):
+        """Decompress one record as UTF-8 text"""
+        return self.read(name).decode('utf-8')
+
+    def close(self):
+        """Release the memory map and file handle"""
+        self.map.close()
+        self.file.close()
+
+    def __contains__(self, name):
+        return name in self.index
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Full-Text Search over the Converted KonvaJS Docs
+
+Keeps a SQLite FTS5 index of the converted text at section granularity.
+HTMLToTextConverter updates it incrementally as pages change, and the
+command line below returns ranked sections with their source URLs, e.g.
+
+    python docs_search.py "cache()" --index konva_docs_text/konvajs_search.sqlite
+"""
+
+import argparse
+import re
+import sqlite3
+import time
+from pathlib import Path
+
+from doc_chunks import DocChunker
+
+# Sections are kept small enough that a hit points at the relevant passage
+SECTION_TOKENS = 256
+
+
+class DocsSearchIndex:
+    """SQLite FTS5 index of documentation sections"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.connection = sqlite3.connect(self.path)
+        self.chunker = DocChunker(SECTION_TOKENS)
+        self.connection.executescript("""
+            CREATE TABLE IF NOT EXISTS pages (
+                source_file TEXT PRIMARY KEY,
+                url TEXT,
+                title TEXT,
+                content_key TEXT
+            );
+            CREATE VIRTUAL TABLE IF NOT EXISTS sections USING fts5(
+                source_file UNINDEXED,
+                url UNINDEXED,
+                title,
+                heading,
+                body,
+                tokenize = 'porter unicode61'
+            );
+        """)
+
+    def page_keys(self):
+        """Return the content key stored for every indexed page"""
+        return dict(self.connection.execute("SELECT source_file, content_key FROM pages"))
+
+    def update_page(self, source_file, text, content_key, headings=None):
+        """Replace the sections of one page, split at its heading outline if given"""
+        with self.connection:
+            self.connection.execute("DELETE FROM sections WHERE source_file = ?", (source_file,))
+            title = url = ""
+            for chunk in self.chunker.chunk_document(text, source_file, headings):
+                title, url = chunk['title'], chunk['url']
+                self.connection.execute(
+                    "INSERT INTO sections (source_file, url, title, heading, body) VALUES (?, ?, ?, ?, ?)",
+                    (source_file, url, title, " > ".join(chunk['heading_path']), chunk['text']),
+                )
+            self.connection.execute(
+                "INSERT OR REPLACE INTO pages (source_file, url, title, content_key) VALUES (?, ?, ?, ?)",
+                (source_file, url, title, content_key),
+            )
+
+    def remove_page(self, source_file):
+        """Drop a page and its sections"""
+        with self.connection:
+            self.connection.execute("DELETE FROM sections WHERE source_file = ?", (source_file,))
+            self.connection.execute("DELETE FROM pages WHERE source_file = ?", (source_file,))
+
+    def sync(self, output_dir, pages, outlines=None):
+        """Bring the index in line with {text filename: content key}, reindexing only changes"""
+        outlines = outlines or {}
+        indexed = self.page_keys()
+        updated = 0
+        removed = 0
+
+        for source_file, content_key in pages.items():
+            if indexed.get(source_file) == content_key:
+                continue
+            with open(Path(output_dir) / source_file, 'r', encoding='utf-8', newline='') as f:
+                self.update_page(source_file, f.read(), content_key, outlines.get(source_file))
+            updated += 1
+
+        for source_file in indexed.keys() - pages.keys():
+            self.remove_page(source_file)
+            removed += 1
+
+        if updated or removed:
+            print(f"Search index: {updated} pages updated, {removed} removed ({self.path})")
+        return updated, removed
+
+    def search(self, query, limit=10, raw=False):
+        """Return the best-matching sections for a query, best first"""
+        if not raw:
+            # Quote each word so input like "cache()" is not read as FTS5 syntax
+            terms = re.findall(r'\w+', query)
+            if not terms:
+                return []
+            query = " ".join(f'"{term}"' for term in terms)
+
+        rows = self.connection.execute("""
+            SELECT title, heading, url, source_file,
+                   snippet(sections, 4, '[', ']', ' ... ', 16),
+                   bm25(sections, 0.0, 0.0, 5.0, 2.0, 1.0) AS score
+            FROM sections
+            WHERE sections MATCH ?
+            ORDER BY score
+            LIMIT ?
+        """, (query, limit))
+
+        return [
+            {'title': title, 'heading': heading, 'url': url, 'source_file': source_file,
+             'snippet': snippet, 'score': score}
+            for title, heading, url, source_file, snippet, score in rows
+        ]
+
+    def close(self):
+        """Close the database connection"""
+        self.connection.close()
+
+
+def main():
+    """Query the search index from the command line"""
+    parser = argparse.ArgumentParser(description="Search the converted KonvaJS documentation")
+    parser.add_argument("query", help="Words to search for")
+    parser.add_argument("--index", default="preprocessing_tilemap/external_context/konva_docs_text/konvajs_search.sqlite",
+                        help="Search index built by html_to_text.py --search-index")
+    parser.add_argument("--limit", type=int, default=10,
+                        help="Maximum number of sections to return")
+    parser.add_argument("--raw", action="store_true",
+                        help="Pass the query to FTS5 unchanged (allows AND/OR/NEAR and prefix*)")
+    args = parser.parse_args()
+
+    if not Path(args.index).exists():
+        print(f"No search index found at {args.index}")
+        return
+
+    index = DocsSearchIndex(args.index)
+    start = time.perf_counter()
+    results = index.search(args.query, args.limit, raw=args.raw)
+    elapsed = (time.perf_counter() - start) * 1000
+    index.close()
+
+    for rank, result in enumerate(results, 1):
+        location = f"{result['title']} > {result['heading']}" if result['heading'] else result['title']
+        print(f"{rank}. {location}")
+        print(f"   {result['url'] or result['source_file']}")
+        print(f"   {result['snippet']}")
+    print(f"\n{len(results)} results in {elapsed:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
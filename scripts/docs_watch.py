@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Watch Mode for the HTML to Text Converter
+
+Keeps one HTMLToTextConverter resident, so imports, the parser and the
+converted page texts stay warm between edits. The input directory (or
+input archive) is polled for modification times, and only the pages whose
+mtime or size moved are hashed and reconverted. The combined file is then
+rebuilt from the text kept in memory, and the chunk file, search index and
+output archive are refreshed as in a normal run.
+"""
+
+import os
+import time
+
+# Frequent enough that a saved page is reconverted well within a second
+DEFAULT_POLL_INTERVAL = 0.2
+
+
+class DocsWatcher:
+    """Reconvert HTML pages as they change, until interrupted"""
+
+    def __init__(self, converter, interval=DEFAULT_POLL_INTERVAL):
+        self.converter = converter
+        self.interval = interval
+        self.converter.text_cache = {}
+
+    def snapshot(self):
+        """Map each watched file to its (mtime, size)"""
+        if self.converter.input_archive:
+            try:
+                stat = self.converter.input_archive.stat()
+            except FileNotFoundError:
+                return {}
+            return {self.converter.input_archive.name: (stat.st_mtime_ns, stat.st_size)}
+
+        files = {}
+        try:
+            with os.scandir(self.converter.input_dir) as entries:
+                for entry in entries:
+                    if entry.name.endswith('.html') and entry.is_file():
+                        stat = entry.stat()
+                        files[entry.name] = (stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            pass
+        return files
+
+    def changed_files(self, before, after):
+        """Names of files added, removed or modified between two snapshots"""
+        return {name for name in before.keys() | after.keys() if before.get(name) != after.get(name)}
+
+    def update(self, changed):
+        """Bring the outputs up to date with the changed files"""
+        started = time.perf_counter()
+        try:
+            # A new archive can change any page, and its index already holds every hash
+            self.converter.convert_changed_files(None if self.converter.input_archive else changed)
+        except Exception as e:
+            print(f"Error updating docs: {e}")
+            return
+        print(f"Updated {len(changed)} changed file(s) in {(time.perf_counter() - started) * 1000:.0f} ms")
+
+    def run(self):
+        """Convert everything once, then poll for changes until Ctrl+C"""
+        watched = self.converter.input_archive or self.converter.input_dir
+
+        # Snapshot first, so edits made during the initial run are picked up next
+        state = self.snapshot()
+        with self.converter.profiler:
+            self.converter.convert_changed_files()
+
+            # --force applies to the initial run only
+            self.converter.force = False
+            print(f"Watching {watched} for changes (Ctrl+C to stop)")
+
+            try:
+                while True:
+                    time.sleep(self.interval)
+                    current = self.snapshot()
+                    changed = self.changed_files(state, current)
+                    if changed:
+                        state = current
+                        self.update(changed)
+            except KeyboardInterrupt:
+                print("\nStopped watching")
+        self.converter.writer.close()
+
+        self.converter.metrics.write_summary(self.converter.metrics_path, extra={
+            'parser': self.converter.parser,
+            'jobs': self.converter.jobs,
+            'watch_interval': self.interval,
+        })
@@ -6,63 +6,234 @@ This script converts the scraped HTML documentation files to clean,
 human-readable plain text format.
 """
 
+import argparse
+import hashlib
+import json
 import os
 import re
-from pathlib import Path
-from bs4 import BeautifulSoup, NavigableString
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from pathlib import Path, PurePosixPath
+from bs4 import NavigableString
 import html
 
+from doc_chunks import DocChunker
+from doc_dedup import DocDeduplicator
+from docs_archive import ArchiveReader, ArchiveWriter
+from docs_search import DocsSearchIndex
+from docs_watch import DEFAULT_POLL_INTERVAL, DocsWatcher
+from output_writer import OutputWriter, publish
+from parser_backend import PARSER_PREFERENCE, make_soup, resolve_parser
+from pipeline_metrics import PROFILE_MODES, HotPathProfiler, RunMetrics, stage_timer
+
+# Bump whenever the conversion output changes so manifests trigger a rebuild
+CONVERTER_VERSION = 2
+
+# Elements whose children are formatted individually rather than flattened
+CONTAINER_TAGS = {'div', 'section', 'article', 'main'}
+
+HEADING_TAGS = ['h1', 'h2', 'h3', 'h4', 'h5', 'h6']
+
+EXCESS_BLANK_LINES_PATTERN = re.compile(r'\n\s*\n\s*\n')
+
+# Short fragments (whitespace between tags, list bullets, link labels) repeat
+# across pages, so their cleaned form is cached; long ones rarely repeat
+CLEAN_CACHE_MAX_LENGTH = 256
+
+# Read size when streaming page outputs into the combined file
+COPY_CHUNK_BYTES = 64 * 1024
+
+
+def normalize_text(text):
+    """Decode HTML entities and collapse whitespace runs to single spaces"""
+    # Only text containing '&' can hold an entity
+    if '&' in text:
+        text = html.unescape(text)
+    
+    # str.split() splits on exactly the characters \s matches, and drops
+    # the leading and trailing runs, so this equals re.sub(r'\s+', ' ').strip()
+    return " ".join(text.split())
+
+
+normalize_short_text = lru_cache(maxsize=16384)(normalize_text)
+
+
 class HTMLToTextConverter:
-    def __init__(self, input_dir="preprocessing_tilemap/external_context/konva_docs/html", output_dir="preprocessing_tilemap/external_context/konva_docs_text"):
+    def __init__(self, input_dir="preprocessing_tilemap/external_context/konva_docs/html", output_dir="preprocessing_tilemap/external_context/konva_docs_text",
+                 force=False, jobs=1, parser="auto", metrics_path=None, profile=None, profile_output=None,
+                 chunk_tokens=None, search_index=False, input_archive=None, output_archive=None,
+                 dedup=False):
         self.input_dir = Path(input_dir)
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(exist_ok=True)
+        self.manifest_path = self.output_dir / ".build_manifest.json"
+        self.force = force
+        self.jobs = jobs if jobs > 0 else (os.cpu_count() or 1)
+        self.parser = resolve_parser(parser)
+        self.metrics = RunMetrics('convert')
+        self.metrics_path = Path(metrics_path) if metrics_path else self.output_dir / "conversion_metrics.json"
+        self.profiler = HotPathProfiler(profile, profile_output)
+        self.chunker = DocChunker(chunk_tokens) if chunk_tokens else None
+        self.chunks_path = self.output_dir / "konvajs_chunks.jsonl"
+        self.chunk_index_path = self.output_dir / "konvajs_chunks.index.json"
+        self.search_index_path = self.output_dir / "konvajs_search.sqlite" if search_index else None
+        self.deduplicator = DocDeduplicator() if dedup else None
+        self.dedup_report_path = self.output_dir / "konvajs_dedup_report.json"
+        self.writer = OutputWriter()  # Outputs are written behind the conversion
+        
+        # Archives written by scrape_konvajs.py --archive replace the input directory
+        self.input_archive = Path(input_archive) if input_archive else None
+        self.output_archive = Path(output_archive) if output_archive else None
+        self.archive = None
+        
+        # Output bytes by filename, kept by watch mode so the combined file
+        # can be rebuilt without rereading every page; None when not watching
+        self.text_cache = None
+    
+    def __getstate__(self):
+        """Leave run-wide instrumentation behind when sent to a worker process"""
+        state = self.__dict__.copy()
+        state['metrics'] = None
+        state['profiler'] = None
+        state['archive'] = None  # Memory maps don't pickle; workers reopen the archive
+        state['text_cache'] = None
+        state['writer'] = None
+        return state
+    
+    def open_archive(self):
+        """Memory-map the input archive on first use"""
+        if self.archive is None:
+            self.archive = ArchiveReader(self.input_archive)
+        return self.archive
+    
+    def source_files(self):
+        """List the HTML sources, from the input archive or the input directory"""
+        if self.input_archive:
+            return [PurePosixPath(name) for name in self.open_archive().names()]
+        return list(self.input_dir.glob("*.html"))
+    
+    def source_hash(self, source):
+        """Return the SHA-256 of a source page; archives record it for every page"""
+        if self.input_archive:
+            return self.open_archive().entry(source.name)['sha256']
+        return self.file_hash(source)
+    
+    def source_exists(self, name):
+        """Check whether a source page is still present"""
+        if self.input_archive:
+            return name in self.open_archive()
+        return (self.input_dir / name).exists()
+    
+    def load_manifest(self):
+        """Load the build manifest from the previous run"""
+        if self.force or not self.manifest_path.exists():
+            return {}
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Warning: Ignoring unreadable manifest {self.manifest_path}: {e}")
+            return {}
+    
+    def save_manifest(self, manifest):
+        """Write the build manifest atomically"""
+        publish(self.manifest_path, json.dumps(manifest, indent=2, sort_keys=True))
+    
+    def file_hash(self, path):
+        """Return the SHA-256 hex digest of a file's bytes"""
+        return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+    
+    def is_up_to_date(self, entry, input_hash):
+        """Check whether a manifest entry still matches its source file"""
+        return (
+            entry is not None
+            and entry.get('input_hash') == input_hash
+            and entry.get('converter_version') == CONVERTER_VERSION
+            and entry.get('parser') == self.parser
+            and (self.output_dir / entry.get('output', '')).is_file()
+        )
+    
+    def convert_files(self, html_files):
+        """Yield (html_file, text, timings, headings) in input order, in a process pool when jobs > 1"""
+        if self.jobs <= 1 or len(html_files) <= 1:
+            for html_file in html_files:
+                yield (html_file, *self.convert_html_file_timed(html_file))
+            return
+        
+        with ProcessPoolExecutor(max_workers=self.jobs) as executor:
+            futures = [(html_file, executor.submit(self.convert_html_file_timed, html_file)) for html_file in html_files]
+            
+            # Collect in submission order so output matches a serial run
+            for html_file, future in futures:
+                try:
+                    yield (html_file, *future.result())
+                except Exception as e:
+                    print(f"Error converting {html_file}: {e}")
+                    yield html_file, None, {}, []
+    
+    def convert_html_file_timed(self, html_file_path):
+        """Convert a single HTML file and return the text with its stage timings and heading outline"""
+        timings = {}
+        headings = []
+        return self.convert_html_file(html_file_path, timings, headings), timings, headings
         
     def clean_text(self, text):
         """Clean and format text content"""
         if not text:
             return ""
         
-        # Decode HTML entities
-        text = html.unescape(text)
-        
-        # Replace multiple whitespace with single space
-        text = re.sub(r'\s+', ' ', text)
-        
-        # Strip leading/trailing whitespace
-        text = text.strip()
-        
-        return text
+        if len(text) <= CLEAN_CACHE_MAX_LENGTH:
+            return normalize_short_text(text)
+        return normalize_text(text)
     
     def extract_text_with_formatting(self, element, indent_level=0):
-        """Extract text with basic formatting preserved"""
+        """Extract text with basic formatting preserved in a single pass over the tree"""
         if not element:
             return ""
         
-        result = []
+        buffer = []
         indent = "  " * indent_level
         
+        # Walk container elements with an explicit stack so nested divs are
+        # visited once and every fragment lands in one output buffer
+        stack = [element]
+        while stack:
+            node = stack.pop()
+            
+            if isinstance(node, NavigableString):
+                text = self.clean_text(str(node))
+                if text:
+                    buffer.append(text)
+            elif node.name in CONTAINER_TAGS:
+                stack.extend(reversed(node.contents))
+            else:
+                self.format_element(node, indent, buffer)
+        
+        return "".join(buffer)
+    
+    def format_element(self, element, indent, buffer):
+        """Append the formatted text of a non-container element to the buffer"""
         # Handle different HTML elements
-        if element.name in ['h1', 'h2', 'h3', 'h4', 'h5', 'h6']:
+        if element.name in HEADING_TAGS:
             level = int(element.name[1])
             prefix = "#" * level + " "
             text = self.clean_text(element.get_text())
             if text:
-                result.append(f"\n{prefix}{text}\n")
+                buffer.append(f"\n{prefix}{text}\n")
         
         elif element.name == 'p':
             text = self.clean_text(element.get_text())
             if text:
-                result.append(f"\n{text}\n")
+                buffer.append(f"\n{text}\n")
         
         elif element.name in ['ul', 'ol']:
-            result.append("\n")
+            buffer.append("\n")
             for i, li in enumerate(element.find_all('li', recursive=False)):
                 text = self.clean_text(li.get_text())
                 if text:
                     prefix = f"{i+1}. " if element.name == 'ol' else "• "
-                    result.append(f"{indent}{prefix}{text}\n")
-            result.append("\n")
+                    buffer.append(f"{indent}{prefix}{text}\n")
+            buffer.append("\n")
         
         elif element.name == 'li':
             # Skip if we're processing it as part of ul/ol
@@ -72,13 +243,13 @@ class HTMLToTextConverter:
             # Code blocks
             code_text = element.get_text()
             if code_text.strip():
-                result.append(f"\n```\n{code_text.rstrip()}\n```\n")
+                buffer.append(f"\n```\n{code_text.rstrip()}\n```\n")
         
         elif element.name == 'code' and element.parent.name != 'pre':
             # Inline code
             text = self.clean_text(element.get_text())
             if text:
-                result.append(f"`{text}`")
+                buffer.append(f"`{text}`")
         
         elif element.name == 'blockquote':
             text = self.clean_text(element.get_text())
@@ -86,63 +257,88 @@ class HTMLToTextConverter:
                 # Split into lines and prefix each with >
                 lines = text.split('\n')
                 quoted = '\n'.join(f"> {line}" for line in lines if line.strip())
-                result.append(f"\n{quoted}\n")
+                buffer.append(f"\n{quoted}\n")
         
         elif element.name == 'a':
             text = self.clean_text(element.get_text())
             href = element.get('href', '')
             if text and href:
-                result.append(f"{text} ({href})")
+                buffer.append(f"{text} ({href})")
             elif text:
-                result.append(text)
-        
-        elif element.name in ['div', 'section', 'article', 'main']:
-            # Process children for container elements
-            for child in element.children:
-                if isinstance(child, NavigableString):
-                    text = self.clean_text(str(child))
-                    if text:
-                        result.append(text)
-                else:
-                    result.append(self.extract_text_with_formatting(child, indent_level))
+                buffer.append(text)
         
         elif element.name in ['br']:
-            result.append("\n")
+            buffer.append("\n")
         
         elif element.name in ['strong', 'b']:
             text = self.clean_text(element.get_text())
             if text:
-                result.append(f"**{text}**")
+                buffer.append(f"**{text}**")
         
         elif element.name in ['em', 'i']:
             text = self.clean_text(element.get_text())
             if text:
-                result.append(f"*{text}*")
+                buffer.append(f"*{text}*")
         
         elif element.name in ['table']:
-            result.append("\n[TABLE CONTENT]\n")
+            buffer.append("\n[TABLE CONTENT]\n")
             for row in element.find_all('tr'):
                 cells = [self.clean_text(cell.get_text()) for cell in row.find_all(['td', 'th'])]
                 if any(cells):
-                    result.append("| " + " | ".join(cells) + " |\n")
-            result.append("\n")
+                    buffer.append("| " + " | ".join(cells) + " |\n")
+            buffer.append("\n")
         
         else:
             # For other elements, just extract text
             text = self.clean_text(element.get_text())
             if text:
-                result.append(text)
-        
-        return "".join(result)
+                buffer.append(text)
     
-    def convert_html_file(self, html_file_path):
-        """Convert a single HTML file to text"""
+    def convert_html_file(self, html_file_path, timings=None, headings=None):
+        """Convert a single HTML file to text, appending its heading outline to headings if given"""
+        timings = {} if timings is None else timings
+        if self.input_archive:
+            return self.convert_archived_page(html_file_path, timings, headings)
         try:
-            with open(html_file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
+            with stage_timer(timings, 'read'):
+                with open(html_file_path, 'r', encoding='utf-8') as f:
+                    content = f.read()
             
-            soup = BeautifulSoup(content, 'html.parser')
+            with stage_timer(timings, 'parse'):
+                soup = make_soup(content, self.parser)
             
+            return self.convert_soup(soup, timings, headings)
+            
+        except Exception as e:
+            print(f"Error converting {html_file_path}: {e}")
+            return None
+    
+    def convert_archived_page(self, source, timings, headings=None):
+        """Convert one article record from the input archive to text"""
+        try:
+            with stage_timer(timings, 'read'):
+                archive = self.open_archive()
+                entry = archive.entry(source.name)
+                content = archive.read_text(source.name)
+            
+            with stage_timer(timings, 'parse'):
+                soup = make_soup(content, self.parser)
+            
+            with stage_timer(timings, 'format'):
+                # Records hold only the article, so it converts like a fused scrape
+                root = soup.body or soup
+                article = root.find(True, recursive=False)
+                if article is None:
+                    return None
+                return self.convert_article(article, entry.get('title', "Untitled"), entry.get('url', ""), headings)
+            
+        except Exception as e:
+            print(f"Error converting {source}: {e}")
+            return None
+    
+    def convert_soup(self, soup, timings, headings=None):
+        """Convert a parsed saved page to text"""
+        with stage_timer(timings, 'extract'):
             # Extract title
             title_elem = soup.find('title')
             title = title_elem.get_text() if title_elem else "Untitled"
@@ -163,49 +359,113 @@ class HTMLToTextConverter:
                 if source_div:
                     source_div.decompose()
             
+        with stage_timer(timings, 'format'):
             # Extract and format text
             if main_content:
                 text_content = self.extract_text_with_formatting(main_content)
             else:
                 text_content = soup.get_text()
             
-            # Clean up the text
-            text_content = re.sub(r'\n\s*\n\s*\n', '\n\n', text_content)  # Remove excessive blank lines
-            text_content = text_content.strip()
-            
-            # Create header
-            header = f"{title}\n{'=' * len(title)}\n\n"
-            if source_url:
-                header += f"Source: {source_url}\n\n"
-            
-            final_content = header + text_content
-            
-            return final_content
+            if headings is not None:
+                headings.extend(self.heading_outline(main_content or soup))
             
-        except Exception as e:
-            print(f"Error converting {html_file_path}: {e}")
-            return None
+            return self.render_document(title, source_url, text_content)
+    
+    def convert_article(self, article, title, source_url="", headings=None):
+        """Convert an extracted article element to text without an HTML round-trip"""
+        # Place the article in a bare body, exactly as in a saved page once the
+        # source-url div is removed, so both paths produce the same text
+        body = make_soup("<body></body>", self.parser).body
+        body.append(article.extract())
+        
+        if headings is not None:
+            headings.extend(self.heading_outline(body))
+        
+        return self.render_document(title, source_url, self.extract_text_with_formatting(body))
+    
+    def heading_outline(self, element):
+        """List [level, text] for each h1-h6 under an element, in document order"""
+        # Taken from the tree because the text output does not always keep
+        # headings on lines of their own, e.g. when a page body is flattened
+        outline = []
+        for heading in element.find_all(HEADING_TAGS):
+            text = self.clean_text(heading.get_text())
+            if text:
+                outline.append([int(heading.name[1]), text])
+        return outline
+    
+    def render_document(self, title, source_url, text_content):
+        """Tidy extracted text and prepend the title and source header"""
+        # Clean up the text
+        text_content = EXCESS_BLANK_LINES_PATTERN.sub('\n\n', text_content)  # Remove excessive blank lines
+        text_content = text_content.strip()
+        
+        # Create header
+        header = f"{title}\n{'=' * len(title)}\n\n"
+        if source_url:
+            header += f"Source: {source_url}\n\n"
+        
+        return header + text_content
     
     def convert_all_files(self):
-        """Convert all HTML files in the input directory"""
-        html_files = list(self.input_dir.glob("*.html"))
+        """Convert new or changed HTML files in the input directory"""
+        if self.profiler.mode == 'cprofile' and self.jobs > 1:
+            print("Note: cProfile only sees this process; use --jobs 1 to profile conversion itself")
+        
+        with self.profiler:
+            self.convert_changed_files()
+            self.writer.close()
+        
+        self.metrics.write_summary(self.metrics_path, extra={'parser': self.parser, 'jobs': self.jobs})
+    
+    def convert_changed_files(self, changed=None):
+        """Convert stale files, prune removed ones and refresh the combined file"""
+        html_files = self.source_files()
         
         if not html_files:
-            print(f"No HTML files found in {self.input_dir}")
+            print(f"No HTML files found in {self.input_archive or self.input_dir}")
             return
         
-        print(f"Found {len(html_files)} HTML files to convert")
-        print(f"Output directory: {self.output_dir.absolute()}")
+        if changed is None:
+            print(f"Found {len(html_files)} HTML files to convert")
+            print(f"Output directory: {self.output_dir.absolute()}")
+            print(f"HTML parser: {self.parser}")
         
+        previous_manifest = self.load_manifest()
+        manifest = {}
         converted_count = 0
+        skipped_count = 0
         
+        input_hashes = {}
         for html_file in html_files:
             if html_file.name == 'index.html':
                 continue  # Skip index file
             
-            print(f"Converting: {html_file.name}")
+            # Watch mode names the files whose mtime moved; trust the manifest for the rest
+            if changed is not None and html_file.name not in changed and html_file.name in previous_manifest:
+                manifest[html_file.name] = previous_manifest[html_file.name]
+                skipped_count += 1
+                continue
             
-            text_content = self.convert_html_file(html_file)
+            with self.metrics.stage(html_file.name, 'hash'):
+                input_hash = self.source_hash(html_file)
+            entry = previous_manifest.get(html_file.name)
+            if self.is_up_to_date(entry, input_hash):
+                manifest[html_file.name] = entry
+                skipped_count += 1
+                self.metrics.mark(html_file.name, 'cache', 'hit')
+                self.metrics.count('cache_hits')
+                continue
+            
+            print(f"Converting: {html_file.name}")
+            input_hashes[html_file] = input_hash
+            self.metrics.mark(html_file.name, 'cache', 'miss')
+            self.metrics.count('cache_misses')
+        
+        for html_file, text_content, timings, headings in self.convert_files(list(input_hashes)):
+            input_hash = input_hashes[html_file]
+            for stage, seconds in timings.items():
+                self.metrics.record(html_file.name, stage, seconds)
             
             if text_content:
                 # Create output filename
@@ -213,46 +473,206 @@ class HTMLToTextConverter:
                 output_path = self.output_dir / text_filename
                 
                 # Save text file
-                with open(output_path, 'w', encoding='utf-8') as f:
-                    f.write(text_content)
+                with self.metrics.stage(html_file.name, 'write'):
+                    self.writer.write(output_path, text_content)
+                if self.text_cache is not None:
+                    self.text_cache[text_filename] = text_content.encode('utf-8')
                 
+                manifest[html_file.name] = {
+                    'input_hash': input_hash,
+                    'converter_version': CONVERTER_VERSION,
+                    'parser': self.parser,
+                    'output': text_filename,
+                    'headings': headings,
+                }
                 print(f"Saved: {output_path}")
                 converted_count += 1
             else:
                 print(f"Failed to convert: {html_file.name}")
+                self.metrics.count('failures')
+        
+        # The manifest and the combined outputs below need every page on disk
+        self.writer.flush()
+        
+        # Remove outputs whose source HTML has disappeared
+        removed_count = 0
+        for name, entry in previous_manifest.items():
+            if name in manifest:
+                continue
+            stale_path = self.output_dir / entry.get('output', '')
+            if stale_path.is_file() and not self.source_exists(name):
+                stale_path.unlink()
+                if self.text_cache is not None:
+                    self.text_cache.pop(stale_path.name, None)
+                print(f"Removed stale output: {stale_path}")
+                removed_count += 1
+        
+        self.save_manifest(manifest)
+        
+        # Rebuild the combined outputs only when something changed
+        outputs_changed = converted_count or removed_count or manifest != previous_manifest
+        combined_path = self.output_dir / "konvajs_complete_docs.txt"
+        dedup_changed = bool(self.deduplicator) != self.dedup_report_path.exists()
+        if outputs_changed or dedup_changed or not combined_path.exists():
+            with self.metrics.stage(combined_path.name, 'combine'):
+                self.create_combined_file(html_files, manifest)
+        
+        if self.chunker and (outputs_changed or self.chunk_index_stale()):
+            with self.metrics.stage(self.chunks_path.name, 'chunk'):
+                self.create_chunk_file(html_files, manifest)
+        
+        if self.search_index_path:
+            with self.metrics.stage(self.search_index_path.name, 'index'):
+                self.update_search_index(manifest)
+        
+        if self.output_archive and (outputs_changed or not self.output_archive.exists()):
+            with self.metrics.stage(self.output_archive.name, 'archive'):
+                self.create_text_archive(html_files, manifest)
         
-        # Create a combined file with all documentation
-        self.create_combined_file(html_files)
+        if self.archive:
+            self.archive.close()
+            self.archive = None
         
-        print(f"\nConversion complete! Converted {converted_count} files.")
+        self.writer.flush()
+        print(f"\nConversion complete! Converted {converted_count} files, "
+              f"{skipped_count} up to date, {removed_count} removed.")
         print(f"Text files saved to: {self.output_dir.absolute()}")
     
-    def create_combined_file(self, html_files):
-        """Create a single combined text file with all documentation"""
-        combined_content = []
-        combined_content.append("KonvaJS Documentation - Complete Reference\n")
-        combined_content.append("=" * 50 + "\n\n")
+    def create_combined_file(self, html_files, manifest):
+        """Create a single combined text file by streaming the per-file outputs"""
+        combined_path = self.output_dir / "konvajs_complete_docs.txt"
+        header = "KonvaJS Documentation - Complete Reference\n\n" + "=" * 50 + "\n\n"
+        separator = "\n\n" + "=" * 80 + "\n\n"
+        text_files = [
+            self.output_dir / manifest[html_file.name]['output']
+            for html_file in sorted(html_files)
+            if html_file.name != 'index.html' and html_file.name in manifest
+        ]
         
-        for html_file in sorted(html_files):
-            if html_file.name == 'index.html':
-                continue
-            
-            text_content = self.convert_html_file(html_file)
-            if text_content:
-                combined_content.append(text_content)
-                combined_content.append("\n" + "=" * 80 + "\n\n")
+        if self.deduplicator:
+            # The report is complete only once the writer thread has produced the file
+            report = {}
+            chunks = self.deduplicator.combined_chunks(text_files, header, separator, report)
+            self.writer.write(combined_path, chunks, on_done=lambda path, changed: self.save_dedup_report(report))
+            print(f"Created combined documentation: {combined_path}")
+            return
         
-        combined_path = self.output_dir / "konvajs_complete_docs.txt"
-        with open(combined_path, 'w', encoding='utf-8') as f:
-            f.write("\n".join(combined_content))
+        # A leftover report would claim the combined file is still deduplicated
+        self.dedup_report_path.unlink(missing_ok=True)
         
+        self.writer.write(combined_path, self.combined_chunks(text_files, header, separator))
         print(f"Created combined documentation: {combined_path}")
-
+    
+    def save_dedup_report(self, report):
+        """Save the deduplication report and count the savings, on the writer thread"""
+        self.deduplicator.write_report(report, self.dedup_report_path)
+        self.metrics.count('dedup_bytes_saved', report['bytes_saved'])
+    
+    def combined_chunks(self, text_files, header, separator):
+        """Stream the combined file: each .txt in sorted source order instead of reconverting the HTML"""
+        yield header
+        for text_file in text_files:
+            yield "\n"
+            if self.text_cache is None:
+                with open(text_file, 'rb') as f:
+                    yield from iter(lambda: f.read(COPY_CHUNK_BYTES), b"")
+            else:
+                yield self.cached_output(text_file)
+            yield separator
+    
+    def cached_output(self, text_file):
+        """Return a text output's bytes, reading it from disk only the first time"""
+        data = self.text_cache.get(text_file.name)
+        if data is None:
+            data = self.text_cache[text_file.name] = text_file.read_bytes()
+        return data
+    
+    def chunk_index_stale(self):
+        """Whether the chunk index is missing or was built with a different token budget"""
+        try:
+            with open(self.chunk_index_path, 'r', encoding='utf-8') as f:
+                return json.load(f).get('max_tokens') != self.chunker.max_tokens
+        except (OSError, ValueError):
+            return True
+    
+    def create_chunk_file(self, html_files, manifest):
+        """Split the per-file outputs into heading-aligned chunks in one JSONL file"""
+        text_files = [
+            self.output_dir / manifest[html_file.name]['output']
+            for html_file in sorted(html_files)
+            if html_file.name != 'index.html' and html_file.name in manifest
+        ]
+        outlines = {entry['output']: entry.get('headings') for entry in manifest.values()}
+        self.chunker.write_chunks(text_files, self.chunks_path, self.chunk_index_path, outlines)
+    
+    def create_text_archive(self, html_files, manifest):
+        """Pack the per-file outputs into one compressed archive"""
+        with ArchiveWriter(self.output_archive) as writer:
+            for html_file in sorted(html_files):
+                entry = manifest.get(html_file.name)
+                if html_file.name == 'index.html' or not entry:
+                    continue
+                writer.add(entry['output'], (self.output_dir / entry['output']).read_bytes(), source=html_file.name)
+    
+    def update_search_index(self, manifest):
+        """Reindex the sections of pages whose text output changed"""
+        # The manifest fields fully determine each output, so no text needs rereading
+        pages = {
+            entry['output']: f"{entry['input_hash']}:{entry['converter_version']}:{entry['parser']}"
+            for entry in manifest.values()
+        }
+        outlines = {entry['output']: entry.get('headings') for entry in manifest.values()}
+        index = DocsSearchIndex(self.search_index_path)
+        try:
+            index.sync(self.output_dir, pages, outlines)
+        finally:
+            index.close()
 
 def main():
     """Main function to run the converter"""
-    converter = HTMLToTextConverter()
-    converter.convert_all_files()
+    parser = argparse.ArgumentParser(description="Convert scraped KonvaJS HTML docs to plain text")
+    parser.add_argument("--input-dir", default="preprocessing_tilemap/external_context/konva_docs/html",
+                        help="Directory containing the scraped HTML files")
+    parser.add_argument("--output-dir", default="preprocessing_tilemap/external_context/konva_docs_text",
+                        help="Directory to write the text files to")
+    parser.add_argument("--force", action="store_true",
+                        help="Ignore the build manifest and reconvert every file")
+    parser.add_argument("--jobs", "-j", type=int, default=1,
+                        help="Worker processes for conversion (0 uses every CPU core)")
+    parser.add_argument("--parser", default="auto", choices=["auto"] + PARSER_PREFERENCE,
+                        help="HTML parser backend (auto picks the fastest installed)")
+    parser.add_argument("--chunk-tokens", type=int, default=None,
+                        help="Also write heading-aligned chunks of at most this many tokens to konvajs_chunks.jsonl")
+    parser.add_argument("--search-index", action="store_true",
+                        help="Keep a full-text search index in konvajs_search.sqlite (query it with docs_search.py)")
+    parser.add_argument("--dedup", action="store_true",
+                        help="Store blocks repeated across pages once in the combined file and report the bytes saved")
+    parser.add_argument("--input-archive", default=None,
+                        help="Read pages from an archive written by scrape_konvajs.py --archive instead of --input-dir")
+    parser.add_argument("--output-archive", default=None,
+                        help="Also pack the text files into this compressed archive")
+    parser.add_argument("--watch", action="store_true",
+                        help="Keep running and reconvert pages as soon as their HTML changes")
+    parser.add_argument("--watch-interval", type=float, default=DEFAULT_POLL_INTERVAL,
+                        help="With --watch, seconds between checks of the input for changes")
+    parser.add_argument("--metrics", default=None,
+                        help="Where to write the JSON run summary (defaults to conversion_metrics.json in the output directory)")
+    parser.add_argument("--profile", default=None, choices=PROFILE_MODES,
+                        help="Profile the conversion with cProfile or tracemalloc")
+    parser.add_argument("--profile-output", default=None,
+                        help="File to save the raw profile or allocation report to")
+    args = parser.parse_args()
+    
+    converter = HTMLToTextConverter(args.input_dir, args.output_dir, force=args.force, jobs=args.jobs,
+                                     parser=args.parser, metrics_path=args.metrics,
+                                     profile=args.profile, profile_output=args.profile_output,
+                                     chunk_tokens=args.chunk_tokens, search_index=args.search_index,
+                                     input_archive=args.input_archive, output_archive=args.output_archive,
+                                     dedup=args.dedup)
+    if args.watch:
+        DocsWatcher(converter, args.watch_interval).run()
+    else:
+        converter.convert_all_files()
 
 
 if __name__ == "__main__":
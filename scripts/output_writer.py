@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Write-Behind Output for the Docs Pipeline
+
+Saving pages on the fetch or convert thread makes every page wait for the
+disk. OutputWriter hands writes to one background thread through a bounded
+queue instead: callers keep fetching and parsing, and block only when the
+writer falls max_pending files behind. Every file is written under a
+temporary name and renamed into place, so readers never see a half-written
+page. Large outputs such as the index and the combined file can be passed
+as an iterable of chunks and are streamed to disk as they are rendered.
+"""
+
+import os
+import queue
+import threading
+from pathlib import Path
+
+# Enough to absorb a burst of pages without holding much of the corpus in memory
+DEFAULT_MAX_PENDING = 64
+
+
+def publish(path, content, skip_unchanged=False):
+    """Write a file through a temporary name and rename it into place; return whether it changed"""
+    path = Path(path)
+    if skip_unchanged and isinstance(content, str) and path.exists():
+        with open(path, 'r', encoding='utf-8', newline='') as f:
+            if f.read() == content:
+                return False
+
+    chunks = [content] if isinstance(content, (str, bytes)) else content
+    tmp_path = path.with_name(path.name + '.tmp')
+    try:
+        with open(tmp_path, 'wb') as f:
+            for chunk in chunks:
+                f.write(chunk.encode('utf-8') if isinstance(chunk, str) else chunk)
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    return True
+
+
+class OutputWriter:
+    """Publish files atomically from a background thread"""
+
+    def __init__(self, max_pending=DEFAULT_MAX_PENDING):
+        self.queue = queue.Queue(maxsize=max(1, max_pending))
+        self.thread = None
+        self.error = None
+        self.lock = threading.Lock()
+
+    def write(self, path, content, skip_unchanged=False, on_done=None):
+        """Queue a file (str, bytes or an iterable of chunks), blocking while max_pending are queued"""
+        # on_done(path, changed) runs on the writer thread once the file is in place
+        self.raise_error()
+        with self.lock:
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, name="output-writer", daemon=True)
+                self.thread.start()
+        self.queue.put((Path(path), content, skip_unchanged, on_done))
+
+    def run(self):
+        """Writer thread: publish queued files in order until told to stop"""
+        while True:
+            job = self.queue.get()
+            try:
+                if job is None:
+                    return
+                path, content, skip_unchanged, on_done = job
+                if self.error is None:
+                    changed = publish(path, content, skip_unchanged)
+                    if on_done:
+                        on_done(path, changed)
+            except Exception as e:
+                # Surfaced to the producer on its next write or flush
+                self.error = e
+            finally:
+                self.queue.task_done()
+
+    def raise_error(self):
+        """Re-raise a failure from the writer thread in the calling thread"""
+        error, self.error = self.error, None
+        if error is not None:
+            raise error
+
+    def flush(self):
+        """Wait until every queued file is on disk"""
+        if self.thread is not None:
+            self.queue.join()
+        self.raise_error()
+
+    def close(self):
+        """Flush outstanding writes and stop the writer thread"""
+        with self.lock:
+            thread, self.thread = self.thread, None
+        if thread is not None:
+            self.queue.put(None)
+            thread.join()
+        self.raise_error()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Streaming Page Parsing for the KonvaJS Docs Scraper
+
+Parsing a buffered page keeps the response bytes, the decoded text and the
+full tree in memory at once. PageStreamParser is fed the response body a
+chunk at a time through Python's incremental html.parser, which discards
+input as soon as it is parsed, and builds no tree at all. It picks the
+article element as start tags arrive, using the same rule as
+KonvaJSDocScraper.find_article (the first element matching the
+highest-priority content selector), and keeps only that element's markup
+for BeautifulSoup to parse. In-docs links are collected on the way
+through, so memory follows the size of the article rather than the page.
+
+The candidate elements (article, main, div) all require end tags, so a
+capture ends when its own tag's nesting depth returns to zero.
+"""
+
+import codecs
+import html
+import re
+from html.parser import HTMLParser
+
+# Selectors that can be matched on a start tag alone, e.g. 'article', '.markdown'
+SIMPLE_SELECTOR_PATTERN = re.compile(r'^(?:(?P<tag>[a-z][a-z0-9-]*)|\.(?P<class_name>[\w-]+))$')
+
+
+def compile_selectors(selectors):
+    """Turn simple tag and class selectors into (priority, tag, class) matchers"""
+    # Descendant selectors such as 'main article' are skipped: whatever they
+    # match is also matched by a simpler selector with higher priority
+    matchers = []
+    for priority, selector in enumerate(selectors):
+        match = SIMPLE_SELECTOR_PATTERN.match(selector)
+        if match:
+            matchers.append((priority, match.group('tag'), match.group('class_name')))
+    return matchers
+
+
+class MarkupCapture:
+    """Raw markup of one element, collected until its end tag"""
+
+    def __init__(self, tag):
+        self.tag = tag
+        self.depth = 0
+        self.parts = []
+
+    def markup(self):
+        """The markup captured so far; BeautifulSoup closes anything left open"""
+        return "".join(self.parts)
+
+
+class PageStreamParser(HTMLParser):
+    """Find a page's article and links while its body is still downloading"""
+
+    def __init__(self, selectors, collect_links=False, encoding='utf-8'):
+        super().__init__(convert_charrefs=True)
+        self.matchers = compile_selectors(selectors)
+        self.collect_links = collect_links
+        self.decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+
+        self.article = None
+        self.article_priority = None
+        self.main = None
+        self.main_div = None
+        self.captures = []
+        self.links = []
+        self.open_links = []
+        self.raw_text_tag = None
+
+    def feed_bytes(self, chunk):
+        """Parse the next chunk of the response body"""
+        self.feed(self.decoder.decode(chunk))
+
+    def close(self):
+        """Finish parsing; a truncated body keeps whatever was captured"""
+        self.feed(self.decoder.decode(b"", final=True))
+        # A tag cut off mid-way would otherwise be flushed as text
+        if self.rawdata.startswith('<'):
+            self.rawdata = ''
+        super().close()
+
+    def capture(self, raw):
+        """Append raw markup to every element being captured"""
+        for capture in self.captures:
+            capture.parts.append(raw)
+
+    def start_capture(self, tag):
+        """Begin capturing an element at its start tag"""
+        capture = MarkupCapture(tag)
+        self.captures.append(capture)
+        return capture
+
+    def handle_starttag(self, tag, attrs):
+        """Handle an opening tag"""
+        self.open_element(tag, attrs, self.get_starttag_text())
+        if tag in self.CDATA_CONTENT_ELEMENTS:
+            self.raw_text_tag = tag
+
+    def handle_startendtag(self, tag, attrs):
+        """Handle a self-closing tag such as <img/>"""
+        self.open_element(tag, attrs, self.get_starttag_text(), self_closing=True)
+
+    def open_element(self, tag, attrs, raw, self_closing=False):
+        """Start capturing a candidate element and track nesting of the captured tags"""
+        attributes = dict(attrs)
+        classes = (attributes.get('class') or '').split()
+
+        priority = self.priority(tag, classes)
+        if priority is not None and (self.article_priority is None or priority < self.article_priority):
+            # A better match makes the weaker candidate and the fallbacks redundant
+            self.captures = []
+            self.main = self.main_div = None
+            self.article = self.start_capture(tag)
+            self.article_priority = priority
+        elif self.article_priority is None:
+            # Fallbacks for pages no selector matches, as in locate_article
+            if tag == 'main' and self.main is None:
+                self.main = self.start_capture(tag)
+            elif tag == 'div' and self.main_div is None and any('main' in name.lower() for name in classes):
+                self.main_div = self.start_capture(tag)
+
+        self.capture(raw)
+        if not self_closing:
+            for capture in self.captures:
+                if capture.tag == tag:
+                    capture.depth += 1
+        self.close_finished()
+
+        if self.collect_links and tag == 'a' and not self_closing:
+            self.open_links.append((attributes.get('href'), []))
+
+    def handle_endtag(self, tag):
+        """Handle a closing tag, finishing captures and links it ends"""
+        if tag == self.raw_text_tag:
+            self.raw_text_tag = None
+        self.capture(f"</{tag}>")
+        for capture in self.captures:
+            if capture.tag == tag:
+                capture.depth -= 1
+        self.close_finished()
+
+        if self.collect_links and tag == 'a' and self.open_links:
+            href, texts = self.open_links.pop()
+            if href:
+                self.links.append((href, "".join(texts)))
+
+    def close_finished(self):
+        """Stop capturing elements whose end tag has been reached"""
+        self.captures = [capture for capture in self.captures if capture.depth > 0]
+
+    def handle_data(self, data):
+        """Handle text, re-escaping it since the parser already decoded entities"""
+        # Script and style content is raw text and was never unescaped
+        self.capture(data if self.raw_text_tag else html.escape(data, quote=False))
+        if self.open_links and not self.raw_text_tag:
+            stripped = data.strip()
+            if stripped:
+                for _, texts in self.open_links:
+                    texts.append(stripped)
+
+    def handle_comment(self, data):
+        """Keep comments inside the article"""
+        self.capture(f"<!--{data}-->")
+
+    def unknown_decl(self, data):
+        """Keep CDATA sections, e.g. in inline SVG"""
+        self.capture(f"<![{data}]>")
+
+    def priority(self, tag, classes):
+        """Priority of the best content selector an element matches, or None"""
+        for priority, selector_tag, class_name in self.matchers:
+            if tag == selector_tag or (class_name and class_name in classes):
+                return priority
+        return None
+
+    def article_html(self):
+        """Markup of the article, or of the fallback content area, for BeautifulSoup"""
+        capture = self.article or self.main or self.main_div
+        return capture.markup() if capture else None
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+HTML Parser Backend Selection
+
+Shared by the scraper and the HTML to text converter. Both build
+BeautifulSoup trees; this module picks the fastest tree builder that is
+installed and falls back to Python's built-in html.parser.
+"""
+
+from functools import lru_cache
+from bs4 import BeautifulSoup, FeatureNotFound
+
+# Fastest first; html.parser ships with Python and is always available
+PARSER_PREFERENCE = ['lxml', 'html.parser']
+
+
+@lru_cache(maxsize=None)
+def is_parser_available(name):
+    """Check whether BeautifulSoup can build trees with the named parser"""
+    try:
+        BeautifulSoup("", name)
+    except FeatureNotFound:
+        return False
+    return True
+
+
+def available_parsers():
+    """List the installed parser backends, fastest first"""
+    return [name for name in PARSER_PREFERENCE if is_parser_available(name)]
+
+
+def resolve_parser(name="auto"):
+    """Resolve 'auto' or an explicit backend name to an installed parser"""
+    if name in (None, "auto"):
+        return available_parsers()[0]
+    
+    if not is_parser_available(name):
+        print(f"Warning: Parser '{name}' is not installed, falling back to html.parser")
+        return 'html.parser'
+    
+    return name
+
+
+def make_soup(markup, parser="html.parser", **kwargs):
+    """Parse markup with the given backend"""
+    return BeautifulSoup(markup, parser, **kwargs)
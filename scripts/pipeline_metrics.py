@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Pipeline Metrics and Profiling
+
+Shared instrumentation for the scraper and the HTML to text converter.
+RunMetrics collects per-page stage timings, byte counts and cache
+hits/misses and writes a JSON summary at the end of a run. HotPathProfiler
+optionally wraps the hot path in cProfile or tracemalloc.
+"""
+
+import cProfile
+import io
+import json
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+from output_writer import publish
+
+PROFILE_MODES = ['cprofile', 'tracemalloc']
+
+# From 3.12 cProfile runs on sys.monitoring: one profile sees every thread,
+# and a second one cannot be enabled while it is active
+CPROFILE_FOLLOWS_THREADS = sys.version_info >= (3, 12)
+
+
+@contextmanager
+def stage_timer(timings, stage):
+    """Add the time spent in the enclosed block to a plain timings dict"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[stage] = timings.get(stage, 0.0) + time.perf_counter() - start
+
+
+class RunMetrics:
+    """Per-page stage timings and counters for one scrape or convert run"""
+
+    def __init__(self, name):
+        self.name = name
+        self.started = time.time()
+        self.pages = {}
+        self.stages = {}
+        self.counters = {}
+        self.lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, page, stage):
+        """Time the enclosed block as one stage of a page"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(page, stage, time.perf_counter() - start)
+
+    def record(self, page, stage, seconds):
+        """Add a stage duration measured elsewhere, e.g. in a worker process"""
+        with self.lock:
+            record = self.pages.setdefault(page, {})
+            record[f"{stage}_seconds"] = record.get(f"{stage}_seconds", 0.0) + seconds
+            totals = self.stages.setdefault(stage, {'count': 0, 'total_seconds': 0.0, 'max_seconds': 0.0})
+            totals['count'] += 1
+            totals['total_seconds'] += seconds
+            totals['max_seconds'] = max(totals['max_seconds'], seconds)
+
+    def add(self, page, key, amount=1):
+        """Add to a per-page value such as bytes transferred"""
+        with self.lock:
+            record = self.pages.setdefault(page, {})
+            record[key] = record.get(key, 0) + amount
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def mark(self, page, key, value):
+        """Set a per-page attribute such as its cache result"""
+        with self.lock:
+            self.pages.setdefault(page, {})[key] = value
+
+    def count(self, counter, amount=1):
+        """Increment a run-wide counter"""
+        with self.lock:
+            self.counters[counter] = self.counters.get(counter, 0) + amount
+
+    def summary(self, extra=None):
+        """Build the JSON-serialisable run summary"""
+        with self.lock:
+            stages = {}
+            for stage, totals in self.stages.items():
+                stages[stage] = dict(totals, mean_seconds=totals['total_seconds'] / totals['count'])
+
+            # Slowest pages first, so a regression points at its page and stage
+            def page_seconds(item):
+                return sum(value for key, value in item[1].items() if key.endswith('_seconds'))
+
+            slowest = sorted(self.pages.items(), key=page_seconds, reverse=True)[:10]
+
+            summary = {
+                'run': self.name,
+                'started': time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(self.started)),
+                'wall_seconds': time.time() - self.started,
+                'counters': dict(self.counters),
+                'stages': stages,
+                'slowest_pages': [dict(record, page=page) for page, record in slowest],
+                'pages': {page: dict(record) for page, record in self.pages.items()},
+            }
+        if extra:
+            summary.update(extra)
+        return summary
+
+    def write_summary(self, path, extra=None):
+        """Write the run summary as JSON, replacing the file atomically"""
+        publish(path, json.dumps(self.summary(extra), indent=2))
+        print(f"Metrics saved to: {path}")
+
+
+class HotPathProfiler:
+    """Optional cProfile or tracemalloc instrumentation around a run"""
+
+    def __init__(self, mode=None, output_path=None, limit=25):
+        if mode not in (None, *PROFILE_MODES):
+            raise ValueError(f"Unknown profile mode: {mode}")
+        self.mode = mode
+        self.output_path = output_path
+        self.limit = limit
+        self.profile = cProfile.Profile() if mode == 'cprofile' else None
+        self.stats = None
+        self.lock = threading.Lock()
+
+    def __enter__(self):
+        if self.mode == 'cprofile':
+            self.profile.enable()
+        elif self.mode == 'tracemalloc':
+            tracemalloc.start(10)
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.mode == 'cprofile':
+            self.profile.disable()
+            self.merge(self.profile)
+            self.report_cprofile()
+        elif self.mode == 'tracemalloc':
+            self.report_tracemalloc()
+            tracemalloc.stop()
+
+    def wrap(self, func):
+        """Profile calls made on worker threads, which cProfile before 3.12 does not follow"""
+        if self.mode != 'cprofile' or CPROFILE_FOLLOWS_THREADS:
+            return func
+
+        def profiled(*args, **kwargs):
+            profile = cProfile.Profile()
+            profile.enable()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                profile.disable()
+                self.merge(profile)
+
+        return profiled
+
+    def merge(self, profile):
+        """Fold one profile into the combined statistics"""
+        with self.lock:
+            if self.stats is None:
+                self.stats = pstats.Stats(profile)
+            else:
+                self.stats.add(profile)
+
+    def report_cprofile(self):
+        """Print the hottest functions and optionally dump the raw stats"""
+        output = io.StringIO()
+        self.stats.stream = output
+        self.stats.sort_stats('cumulative').print_stats(self.limit)
+        print(output.getvalue())
+        if self.output_path:
+            self.stats.dump_stats(self.output_path)
+            print(f"Profile saved to: {self.output_path}")
+
+    def report_tracemalloc(self):
+        """Print peak memory and the largest allocation sites"""
+        current, peak = tracemalloc.get_traced_memory()
+        print(f"\nMemory: current {current / 1024 / 1024:.1f} MiB, peak {peak / 1024 / 1024:.1f} MiB")
+        snapshot = tracemalloc.take_snapshot()
+        lines = [f"Peak traced memory: {peak} bytes"]
+        for stat in snapshot.statistics('lineno')[:self.limit]:
+            lines.append(str(stat))
+        print("\n".join(lines[1:]))
+        if self.output_path:
+            with open(self.output_path, 'w', encoding='utf-8') as f:
+                f.write("\n".join(lines) + "\n")
+            print(f"Profile saved to: {self.output_path}")
@@ -7,22 +7,228 @@ by navigating through all pages in the docs sidebar and extracting
 article content.
 """
 
+import argparse
+import hashlib
 import time
 import json
-import os
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from bs4 import BeautifulSoup
 import requests
+import soupsieve
+from bs4 import SoupStrainer
+from requests.adapters import HTTPAdapter
 from urllib.parse import urljoin, urlparse
 import re
 
+from asset_mirror import ASSETS_DIR_NAME, AssetMirror
+from crawl_frontier import CrawlFrontier, parse_sitemap
+from docs_archive import ArchiveReader, ArchiveWriter
+from html_to_text import HTMLToTextConverter
+from output_writer import OutputWriter, publish
+from page_stream import PageStreamParser
+from parser_backend import PARSER_PREFERENCE, make_soup, resolve_parser
+from pipeline_metrics import PROFILE_MODES, HotPathProfiler, RunMetrics
+
+
+class TokenBucket:
+    """Token-bucket rate limiter refilled at a fixed rate"""
+
+    def __init__(self, rate, capacity=1):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available, then consume it"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class HostRateLimiter:
+    """Hand out one token bucket per host so every site keeps its own budget"""
+
+    def __init__(self, rate=1.0, burst=1):
+        # A bucket that can never hold a whole token would block forever
+        if rate < 0 or (rate and burst < 1):
+            raise ValueError(f"Rate limit needs rate >= 0 and burst >= 1, got rate={rate}, burst={burst}")
+        self.rate = rate
+        self.burst = burst
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    def wait(self, url):
+        """Block until a request to the URL's host is allowed"""
+        if not self.rate:
+            return  # Rate limiting disabled
+
+        host = urlparse(url).netloc
+        with self.lock:
+            bucket = self.buckets.get(host)
+            if bucket is None:
+                bucket = self.buckets[host] = TokenBucket(self.rate, self.burst)
+        bucket.acquire()
+
+
+def create_session(pool_size=10):
+    """Create a shared HTTP session with pooled keep-alive connections"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, pool_block=True)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.headers.update({
+        'Accept-Encoding': 'gzip, deflate',
+        'Connection': 'keep-alive',
+    })
+    return session
+
+
+class ResponseCache:
+    """On-disk store of HTTP validators and body hashes, keyed by URL"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.entries = {}
+        self.lock = threading.Lock()
+        if self.path.exists():
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self.entries = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"Warning: Ignoring unreadable cache {self.path}: {e}")
+
+    def get(self, url):
+        """Return the cached entry for a URL, if any"""
+        with self.lock:
+            return self.entries.get(url)
+
+    def update(self, url, entry):
+        """Store the validators and body hash seen for a URL"""
+        with self.lock:
+            self.entries[url] = entry
+
+    def discard(self, url):
+        """Forget a URL, so its next fetch is unconditional"""
+        with self.lock:
+            self.entries.pop(url, None)
+
+    def conditional_headers(self, entry):
+        """Build If-None-Match / If-Modified-Since headers from a cache entry"""
+        headers = {}
+        if entry:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def save(self):
+        """Write the cache to disk atomically"""
+        with self.lock:
+            data = json.dumps(self.entries, indent=2, sort_keys=True)
+        publish(self.path, data)
+
+
+# Returned by scrape_page when the upstream page has not changed
+NOT_MODIFIED = object()
+
+# Selectors for the main content, in priority order
+CONTENT_SELECTORS = [
+    'article',
+    'main article',
+    '.markdown',
+    '.content',
+    '.documentation-content',
+    '[role="main"] article',
+    'main .markdown',
+    '.docs-content'
+]
+COMPILED_CONTENT_SELECTORS = [soupsieve.compile(selector) for selector in CONTENT_SELECTORS]
+ANY_CONTENT_SELECTOR = soupsieve.compile(', '.join(CONTENT_SELECTORS))
+
+# The top-priority selector can be matched while parsing, so only its subtree is built
+ARTICLE_STRAINER = SoupStrainer('article')
+SIDEBAR_STRAINER = SoupStrainer('nav', attrs={'aria-label': 'Docs sidebar'})
+LINK_STRAINER = SoupStrainer('a', href=True)
+
+# Read size when streaming a page body into the incremental parser
+STREAM_CHUNK_BYTES = 64 * 1024
+
+
 class KonvaJSDocScraper:
-    def __init__(self, base_url="https://konvajs.org/docs/", output_dir="konva_docs"):
+    def __init__(self, base_url="https://konvajs.org/docs/", output_dir="konva_docs",
+                 workers=4, requests_per_second=1.0, burst=1,
+                 pool_size=None, max_retries=3, backoff_factor=0.5, timeout=10,
+                 use_cache=True, parser="auto", text_dir=None, save_html=True,
+                 metrics_path=None, profile=None, profile_output=None,
+                 archive_path=None, archive_codec='auto', max_depth=0, use_sitemap=False,
+                 resume=False, checkpoint_interval=5.0, mirror_assets=False, asset_budget=None,
+                 stream=False, max_page_bytes=None):
         self.base_url = base_url
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(exist_ok=True)
         self.scraped_urls = set()
         self.doc_links = []
+        self.workers = max(1, workers)
+        self.rate_limiter = HostRateLimiter(requests_per_second, burst)
+        self.session = create_session(pool_size or max(self.workers, 10))
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.timeout = timeout
+        self.failed_urls = {}
+        self.cache = ResponseCache(self.output_dir / ".http_cache.json") if use_cache else None
+        self.changed_files = []
+        self.writer = OutputWriter()  # Pages are written behind the crawl, off the fetch path
+        self.parser = resolve_parser(parser)
+        self.article_hosts = set()
+        
+        # With a text directory, articles are converted to text as they are scraped
+        self.converter = HTMLToTextConverter(self.output_dir, text_dir, parser=self.parser) if text_dir else None
+        self.save_html = save_html or self.converter is None
+        self.stats = {'requests': 0, 'retries': 0, 'failures': 0, 'not_modified': 0, 'truncated': 0}
+        self.stats_lock = threading.Lock()
+        self.metrics = RunMetrics('scrape')
+        self.metrics_path = Path(metrics_path) if metrics_path else self.output_dir / "crawl_metrics.json"
+        self.profiler = HotPathProfiler(profile, profile_output)
+        
+        # With an archive, pages go into one compressed file instead of loose HTML
+        self.archive_path = Path(archive_path) if archive_path else None
+        self.archive_codec = archive_codec
+        self.archive_writer = None
+        self.previous_archive = None
+        
+        # Pages are seeded from the sidebar (and sitemap), then links are followed up to max_depth
+        self.frontier = CrawlFrontier(base_url, max_depth)
+        self.use_sitemap = use_sitemap
+        
+        # Crawl state is checkpointed so an interrupted crawl can pick up where it stopped
+        self.checkpoint_path = self.output_dir / ".crawl_checkpoint.json"
+        self.checkpoint_interval = checkpoint_interval
+        self.last_checkpoint = time.monotonic()
+        self.retry_counts = {}
+        self.resume = resume
+        
+        # Streamed pages are parsed as they download, and cut off at max_page_bytes
+        self.stream = stream
+        self.max_page_bytes = max_page_bytes
+        self.truncated_urls = {}
+        
+        # Images are mirrored next to the saved HTML so the pages work offline
+        self.assets = None
+        if mirror_assets and self.save_html:
+            self.assets = AssetMirror(self.fetch, self.cache, self.output_dir / ASSETS_DIR_NAME,
+                                      asset_budget, self.workers)
         
     def sanitize_filename(self, text):
         """Convert URL or title to safe filename"""
@@ -33,13 +239,17 @@ class KonvaJSDocScraper:
     
     def extract_sidebar_links(self, html_content):
         """Extract all documentation links from the sidebar"""
-        soup = BeautifulSoup(html_content, 'html.parser')
+        # Build only the sidebar subtree; parse the full page if it is missing
+        soup = make_soup(html_content, self.parser, parse_only=SIDEBAR_STRAINER)
+        sidebar = soup.find('nav', {'aria-label': 'Docs sidebar'})
         
-        # Find the docs sidebar
-        sidebar = soup.find('nav', {'aria-label': 'Docs sidebar'}) or \
-                 soup.find('div', class_=lambda x: x and 'sidebar' in x.lower()) or \
-                 soup.find('aside') or \
-                 soup.select('[data-testid*="sidebar"]')
+        if not sidebar:
+            soup = make_soup(html_content, self.parser)
+            
+            # Find the docs sidebar
+            sidebar = soup.find('div', class_=lambda x: x and 'sidebar' in x.lower()) or \
+                     soup.find('aside') or \
+                     soup.select('[data-testid*="sidebar"]')
         
         if not sidebar:
             print("Warning: Could not find docs sidebar")
@@ -73,27 +283,100 @@ class KonvaJSDocScraper:
         
         return doc_links
     
+    def extract_page_links(self, html_content, url):
+        """Collect the in-docs links on a page, including nested sidebar sections"""
+        soup = make_soup(html_content, self.parser, parse_only=LINK_STRAINER)
+        anchors = [(link['href'], link.get_text(strip=True)) for link in soup.find_all('a', href=True)]
+        return self.in_scope_links(anchors, url)
+    
+    def in_scope_links(self, anchors, url):
+        """Resolve (href, text) pairs found on a page and keep the in-docs ones"""
+        links = []
+        for href, title in anchors:
+            if href.startswith('#'):
+                continue
+            full_url = urljoin(url, href)
+            if self.frontier.in_scope(full_url):
+                links.append({'url': full_url, 'title': title})
+        return links
+    
+    def fetch_sitemap(self):
+        """Return the in-docs page URLs listed in the site's sitemap.xml, if it has one"""
+        sitemap_urls = [urljoin(self.base_url, '/sitemap.xml')]
+        page_urls = []
+        
+        # A sitemap index points at further sitemaps; follow it one level
+        for _ in range(2):
+            nested = []
+            for sitemap_url in sitemap_urls:
+                try:
+                    pages, sitemaps = parse_sitemap(self.fetch(sitemap_url).content)
+                except Exception as e:
+                    print(f"Could not read sitemap {sitemap_url}: {e}")
+                    continue
+                page_urls.extend(url for url in pages if self.frontier.in_scope(url))
+                nested.extend(sitemaps)
+            sitemap_urls = nested
+        
+        print(f"Found {len(page_urls)} documentation pages in the sitemap")
+        return page_urls
+    
+    def queue_link(self, url, title, depth):
+        """Add a discovered page to the frontier under a filename derived from its URL"""
+        filename = self.sanitize_filename(self.frontier.filename_for_url(url))
+        return self.frontier.add(url, title or filename, depth, filename)
+    
     def extract_article_content(self, html_content, url):
-        """Extract the main article content from a documentation page"""
-        soup = BeautifulSoup(html_content, 'html.parser')
-        
-        # Try different selectors for the main content
-        content_selectors = [
-            'article',
-            'main article',
-            '.markdown',
-            '.content',
-            '.documentation-content',
-            '[role="main"] article',
-            'main .markdown',
-            '.docs-content'
-        ]
+        """Extract the main article content from a documentation page as HTML"""
+        article = self.extract_article_element(html_content, url)
+        return str(article) if article else None
+    
+    def extract_article_element(self, html_content, url):
+        """Extract and clean the main article element from a documentation page"""
+        with self.metrics.stage(url, 'parse'):
+            article = self.locate_article(html_content, url)
+        if not article:
+            return None
         
+        with self.metrics.stage(url, 'extract'):
+            return self.clean_article(article, url)
+    
+    def extract_streamed_article(self, stream, url):
+        """Clean the article a streaming parse picked out, parsing only its own markup"""
+        with self.metrics.stage(url, 'parse'):
+            if stream.article is None:
+                print(f"Warning: Could not find article content for {url}")
+            markup = stream.article_html()
+            if markup is None:
+                return None
+            soup = make_soup(markup, self.parser)
+            article = (soup.body or soup).find(True, recursive=False)
+        if not article:
+            return None
+        
+        with self.metrics.stage(url, 'extract'):
+            return self.clean_article(article, url)
+    
+    def locate_article(self, html_content, url):
+        """Parse a page and find its main content element"""
+        host = urlparse(url).netloc
         article = None
-        for selector in content_selectors:
-            article = soup.select_one(selector)
-            if article:
-                break
+        
+        # Pages on one site share a template, so on hosts whose pages had an
+        # <article> first try a partial parse that keeps only <article> subtrees.
+        # 'article' is the top-priority selector, so the first one found is what
+        # a full parse would pick; lower-priority matches can't be strained
+        # this way without hiding an article around them. The shortcut never
+        # changes the result, so which worker updates the host set first is moot.
+        if host in self.article_hosts:
+            soup = make_soup(html_content, self.parser, parse_only=ARTICLE_STRAINER)
+            article = soup.find('article')
+        
+        if not article:
+            soup = make_soup(html_content, self.parser)
+            article, selector = self.find_article(soup)
+            if selector == CONTENT_SELECTORS[0]:
+                self.article_hosts.add(host)
         
         if not article:
             print(f"Warning: Could not find article content for {url}")
@@ -104,6 +387,10 @@ class KonvaJSDocScraper:
             else:
                 return None
         
+        return article
+    
+    def clean_article(self, article, url):
+        """Strip page chrome from an article and make its links absolute"""
         # Clean up the content
         # Remove navigation elements, ads, etc.
         for elem in article.find_all(['nav', 'aside', 'header', 'footer']):
@@ -125,7 +412,29 @@ class KonvaJSDocScraper:
             if src.startswith('/') or not src.startswith('http'):
                 img['src'] = urljoin(url, src)
         
-        return str(article)
+        return article
+    
+    def find_article(self, soup):
+        """Find the content element by resolving all selectors in one pass"""
+        best_priority = None
+        article = None
+        
+        # Keep the first match of the highest-priority selector
+        for element in ANY_CONTENT_SELECTOR.iselect(soup):
+            priority = next(i for i, selector in enumerate(COMPILED_CONTENT_SELECTORS) if selector.match(element))
+            if best_priority is None or priority < best_priority:
+                best_priority = priority
+                article = element
+                if priority == 0:
+                    break
+        
+        if article is None:
+            return None, None
+        return article, CONTENT_SELECTORS[best_priority]
+    
+    def document_title(self, title):
+        """Title used for a saved page"""
+        return f"{title} - KonvaJS Documentation"
     
     def save_page_content(self, content, filename, title, url):
         """Save the extracted content to an HTML file"""
@@ -134,7 +443,7 @@ class KonvaJSDocScraper:
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>{title} - KonvaJS Documentation</title>
+    <title>{self.document_title(title)}</title>
     <style>
         body {{
             font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
@@ -177,74 +486,472 @@ class KonvaJSDocScraper:
 </body>
 </html>"""
         
-        filepath = self.output_dir / f"{filename}.html"
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(html_template)
-        
-        print(f"Saved: {filepath}")
+        return self.write_if_changed(self.output_dir / f"{filename}.html", html_template)
+    
+    def save_text_content(self, text_content, filename):
+        """Save converted text next to the other text outputs"""
+        return self.write_if_changed(self.converter.output_dir / f"{filename}.txt", text_content)
+    
+    def write_if_changed(self, filepath, content):
+        """Queue a file write, leaving identical files untouched so downstream tools only see real changes"""
+        self.writer.write(filepath, content, skip_unchanged=True, on_done=self.file_written)
         return filepath
     
+    def file_written(self, filepath, changed):
+        """Report a file once the output writer has published it"""
+        if changed:
+            self.changed_files.append(filepath)
+            print(f"Saved: {filepath}")
+        else:
+            print(f"Unchanged: {filepath}")
+    
+    def save_to_archive(self, content, filename, title, url):
+        """Add a page's article HTML to the archive being written"""
+        name = f"{filename}.html"
+        self.archive_writer.add(name, content, title=self.document_title(title), url=url)
+        
+        previous = self.previous_archive.entry(name) if self.previous_archive and name in self.previous_archive else None
+        if not previous or previous['sha256'] != self.archive_writer.index[name]['sha256']:
+            self.changed_files.append(f"{self.archive_path}:{name}")
+            print(f"Archived: {name}")
+    
+    def carry_over_archived_page(self, filename):
+        """Keep the previous archive's copy of a page that was not refetched"""
+        name = f"{filename}.html"
+        if self.archive_writer and self.previous_archive and name in self.previous_archive:
+            self.archive_writer.copy_from(self.previous_archive, name)
+    
+    def page_saved(self, filename):
+        """Check whether every output for a page is already on disk"""
+        if self.archive_path:
+            if not (self.previous_archive and f"{filename}.html" in self.previous_archive):
+                return False
+        elif self.save_html and not (self.output_dir / f"{filename}.html").exists():
+            return False
+        if self.converter and not (self.converter.output_dir / f"{filename}.txt").exists():
+            return False
+        return True
+    
+    def count(self, stat, amount=1):
+        """Increment a crawl statistic from any worker thread"""
+        with self.stats_lock:
+            self.stats[stat] += amount
+    
+    def record_failure(self, url, error):
+        """Remember a URL that could not be scraped"""
+        with self.stats_lock:
+            self.stats['failures'] += 1
+            self.failed_urls[url] = str(error)
+    
+    def backoff_delay(self, attempt):
+        """Exponential backoff with jitter for the given retry attempt"""
+        delay = self.backoff_factor * (2 ** attempt)
+        return delay / 2 + random.uniform(0, delay / 2)
+    
+    def fetch(self, url, headers=None, stream=False):
+        """Fetch a URL, retrying timeouts and 5xx responses with backoff"""
+        for attempt in range(self.max_retries + 1):
+            self.rate_limiter.wait(url)
+            self.count('requests')
+            try:
+                with self.metrics.stage(url, 'fetch'):
+                    response = self.session.get(url, headers=headers, timeout=self.timeout, stream=stream)
+            except (requests.Timeout, requests.ConnectionError) as e:
+                error = e
+            else:
+                if response.status_code < 500:
+                    if stream and response.status_code >= 400:
+                        response.close()
+                    response.raise_for_status()
+                    if not stream:
+                        self.metrics.add(url, 'bytes', len(response.content))
+                    return response
+                response.close()
+                error = requests.HTTPError(
+                    f"{response.status_code} Server Error for url: {url}", response=response
+                )
+            
+            if attempt == self.max_retries:
+                raise error
+            
+            delay = self.backoff_delay(attempt)
+            print(f"Retrying {url} in {delay:.1f}s ({error})")
+            self.count('retries')
+            with self.stats_lock:
+                self.retry_counts[url] = self.retry_counts.get(url, 0) + 1
+            time.sleep(delay)
+    
+    def read_streamed_page(self, response, url, follow_links):
+        """Feed a response body to the incremental parser chunk by chunk, stopping at max_page_bytes"""
+        stream = PageStreamParser(CONTENT_SELECTORS, follow_links, response.encoding or 'utf-8')
+        digest = hashlib.sha256()
+        size = 0
+        truncated = False
+        
+        with self.metrics.stage(url, 'stream'):
+            try:
+                for chunk in response.iter_content(STREAM_CHUNK_BYTES):
+                    if self.max_page_bytes is not None and size + len(chunk) > self.max_page_bytes:
+                        chunk = chunk[:self.max_page_bytes - size]
+                        truncated = True
+                    size += len(chunk)
+                    digest.update(chunk)
+                    stream.feed_bytes(chunk)
+                    if truncated:
+                        break
+            finally:
+                response.close()
+            stream.close()
+        
+        self.metrics.add(url, 'bytes', size)
+        if truncated:
+            print(f"Warning: Truncated {url} at {size} bytes (--max-page-mb)")
+            self.count('truncated')
+            self.metrics.mark(url, 'truncated', True)
+            with self.stats_lock:
+                self.truncated_urls[url] = size
+        return stream, digest.hexdigest(), truncated
+    
+    def scrape_page(self, index, link_info):
+        """Fetch a documentation page and extract its article (as HTML and/or text) and its links"""
+        url = link_info['url']
+        print(f"[{index}/{len(self.doc_links)}] Scraping: {link_info['title']} ({url})")
+        follow_links = link_info.get('depth', 0) < self.frontier.max_depth
+        
+        # Only revalidate pages whose saved copy is still on disk; a 304 has
+        # no body, so the links must also have been recorded last time
+        cached = None
+        if self.cache and self.page_saved(link_info['filename']):
+            cached = self.cache.get(url)
+        revalidate = cached and not (follow_links and 'links' not in cached)
+        
+        response = self.fetch(url, headers=self.cache.conditional_headers(cached) if revalidate else None,
+                              stream=self.stream)
+        if response.status_code == 304:
+            response.close()
+            self.record_cache_result(url, 'hit')
+            return NOT_MODIFIED, None, cached.get('links', []) if follow_links else []
+        
+        stream = None
+        truncated = False
+        if self.stream:
+            stream, sha256, truncated = self.read_streamed_page(response, url, follow_links)
+        else:
+            sha256 = hashlib.sha256(response.content).hexdigest()
+        
+        entry = {
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'sha256': sha256,
+        }
+        links = []
+        if follow_links:
+            with self.metrics.stage(url, 'links'):
+                if self.stream:
+                    links = entry['links'] = self.in_scope_links(stream.links, url)
+                else:
+                    links = entry['links'] = self.extract_page_links(response.text, url)
+        
+        # A truncated page is never cached, so the next run fetches it again
+        if truncated:
+            entry = None
+            if self.cache:
+                self.cache.discard(url)
+        elif cached and cached.get('sha256') == entry['sha256']:
+            self.record_cache_result(url, 'hit')
+            return NOT_MODIFIED, entry, links
+        self.record_cache_result(url, 'miss')
+        
+        if self.stream:
+            article = self.extract_streamed_article(stream, url)
+        else:
+            article = self.extract_article_element(response.text, url)
+        if not article:
+            return None, entry, links
+        
+        if self.assets:
+            with self.metrics.stage(url, 'assets'):
+                self.assets.localize(article)
+        
+        # Serialize before converting, since conversion moves the element
+        page = {'html': None, 'text': None}
+        if self.save_html:
+            with self.metrics.stage(url, 'serialize'):
+                page['html'] = str(article)
+        if self.converter:
+            with self.metrics.stage(url, 'convert'):
+                page['text'] = self.converter.convert_article(article, self.document_title(link_info['title']), url)
+        return page, entry, links
+    
+    def record_cache_result(self, url, result):
+        """Note whether the response cache saved a download for this page"""
+        if self.cache:
+            self.metrics.mark(url, 'cache', result)
+            self.metrics.count(f"cache_{result}s")
+    
     def scrape_docs(self):
         """Main scraping function that coordinates the entire process"""
+        with self.profiler:
+            self.crawl()
+        
+        self.metrics.write_summary(self.metrics_path, extra={
+            'stats': dict(self.stats),
+            'failed_urls': dict(self.failed_urls),
+            'changed_files': [str(path) for path in self.changed_files],
+            'parser': self.parser,
+            'workers': self.workers,
+            'assets': dict(self.assets.stats) if self.assets else None,
+            'truncated_pages': dict(self.truncated_urls),
+        })
+    
+    def crawl(self):
+        """Fetch the sidebar, scrape every page and save the results"""
         print(f"Starting KonvaJS documentation scrape...")
         print(f"Output directory: {self.output_dir.absolute()}")
+        print(f"HTML parser: {self.parser}")
+        
+        resumed = self.resume and self.load_checkpoint()
+        if not resumed:
+            # First, get the main docs page to extract sidebar links
+            print(f"Fetching main docs page: {self.base_url}")
+            
+            try:
+                main_page_content = self.fetch(self.base_url).text
+            except Exception as e:
+                print(f"Error fetching main page: {e}")
+                self.record_failure(self.base_url, e)
+                return
+            
+            # Seed the frontier; it queues each normalized URL once, so pages the
+            # sidebar lists twice or the sitemap repeats are only scraped once
+            for link_info in self.extract_sidebar_links(main_page_content):
+                self.frontier.add(link_info['url'], link_info['title'], 0, link_info['filename'])
+            if self.use_sitemap:
+                for url in self.fetch_sitemap():
+                    self.queue_link(url, None, 0)
+            self.doc_links = self.frontier.entries
+            print(f"Found {len(self.doc_links)} documentation links")
+        
+        if self.archive_path:
+            if self.archive_path.exists():
+                self.previous_archive = ArchiveReader(self.archive_path)
+            self.archive_writer = ArchiveWriter(self.archive_path, self.archive_codec)
+            
+            # Pages finished before the interruption are not fetched again
+            for link_info in self.doc_links:
+                if link_info['url'] in self.scraped_urls:
+                    self.carry_over_archived_page(link_info['filename'])
+        
+        try:
+            self.scrape_frontier()
+        except BaseException:
+            self.save_checkpoint()
+            if self.archive_writer:
+                self.publish_partial_archive()
+            raise
+        finally:
+            if self.previous_archive:
+                self.previous_archive.close()
+        
+        if self.archive_writer:
+            self.archive_writer.close()
+        
+        if self.assets:
+            self.assets.close()
+        
+        self.save_checkpoint(complete=True)
+        
+        # Index the pages that were actually saved, now that the crawl is over
+        if self.save_html and not self.archive_path:
+            self.create_index_file()
+        
+        if self.converter:
+            self.create_combined_text_file()
+        self.writer.close()
+        
+        print(f"\nScraping complete! Scraped {len(self.scraped_urls)} pages.")
+        print(f"Requests: {self.stats['requests']}, retries: {self.stats['retries']}, "
+              f"failures: {self.stats['failures']}, not modified: {self.stats['not_modified']}")
+        print(f"Changed files: {len(self.changed_files)}")
+        for url, error in self.failed_urls.items():
+            print(f"  Failed: {url} ({error})")
+        for url, size in self.truncated_urls.items():
+            print(f"  Truncated: {url} ({size} bytes kept)")
+        print(f"Files saved to: {self.archive_path or self.output_dir.absolute()}")
+    
+    def publish_partial_archive(self):
+        """Publish the pages scraped before an interruption, keeping the rest of the previous archive"""
+        if self.previous_archive:
+            for name in self.previous_archive.names():
+                if name not in self.archive_writer.index:
+                    self.archive_writer.copy_from(self.previous_archive, name)
+        self.archive_writer.close()
+    
+    def save_checkpoint(self, complete=False):
+        """Write the crawl state to disk atomically"""
+        # Pages the checkpoint counts as done must be on disk first
+        self.writer.flush()
+        
+        with self.stats_lock:
+            state = {
+                'base_url': self.base_url,
+                'complete': complete,
+                'saved': time.strftime('%Y-%m-%d %H:%M:%S'),
+                'frontier': self.frontier.to_state(),
+                'completed': sorted(self.scraped_urls),
+                'failed': dict(self.failed_urls),
+                'retries': dict(self.retry_counts),
+            }
+        
+        publish(self.checkpoint_path, json.dumps(state, indent=2))
+        
+        # Validators must match the pages the checkpoint counts as done
+        if self.cache:
+            self.cache.save()
+        self.last_checkpoint = time.monotonic()
+    
+    def checkpoint_if_due(self):
+        """Checkpoint at most once per interval; rewriting the state for every page would dominate long crawls"""
+        if time.monotonic() - self.last_checkpoint >= self.checkpoint_interval:
+            self.save_checkpoint()
+    
+    def load_checkpoint(self):
+        """Restore the state of an interrupted crawl; return False when there is nothing to resume"""
+        if not self.checkpoint_path.exists():
+            print("No checkpoint found, starting a new crawl")
+            return False
+        try:
+            with open(self.checkpoint_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Warning: Ignoring unreadable checkpoint {self.checkpoint_path}: {e}")
+            return False
         
-        # First, get the main docs page to extract sidebar links
-        print(f"Fetching main docs page: {self.base_url}")
+        # A finished crawl is only resumed to retry the pages that failed
+        if state.get('complete') and not state.get('failed'):
+            print("The last crawl finished, starting a new one")
+            return False
+        if not state['frontier']['entries']:
+            print("The last crawl found no pages, starting a new one")
+            return False
+        if state.get('base_url') != self.base_url:
+            print(f"Warning: Checkpoint is for {state.get('base_url')}, starting a new crawl")
+            return False
         
+        self.frontier = CrawlFrontier.from_state(state['frontier'], self.frontier.max_depth)
+        self.doc_links = self.frontier.entries
+        self.scraped_urls = set(state['completed'])
+        self.failed_urls = dict(state['failed'])
+        self.retry_counts = dict(state['retries'])
+        print(f"Resuming crawl from {state['saved']}: {len(self.scraped_urls)} of {len(self.doc_links)} pages done, "
+              f"{len(self.failed_urls)} failed pages to retry")
+        return True
+    
+    def scrape_frontier(self):
+        """Scrape the frontier breadth-first, one link depth at a time"""
+        depth = 0
+        # A resumed crawl can have finished levels, so keep going while deeper pages exist
+        while depth <= self.frontier.max_depth and any(link_info['depth'] >= depth for link_info in self.doc_links):
+            pending = [
+                (i, link_info) for i, link_info in enumerate(self.doc_links, 1)
+                if link_info['depth'] == depth and link_info['url'] not in self.scraped_urls
+            ]
+            if pending:
+                if depth:
+                    print(f"\nFollowing links at depth {depth}: {len(pending)} new pages")
+                self.scrape_pending(pending, depth)
+            depth += 1
+    
+    def scrape_pending(self, pending, depth=0):
+        """Scrape the queued pages, save their results in frontier order and queue their links"""
+        # Fetch concurrently; the per-host rate limiter keeps the crawl polite
+        executor = ThreadPoolExecutor(max_workers=self.workers)
+        futures = []
+        saved = 0
         try:
-            response = requests.get(self.base_url, timeout=10)
-            response.raise_for_status()
-            main_page_content = response.text
+            for i, link_info in pending:
+                futures.append((link_info, executor.submit(self.profiler.wrap(self.scrape_page), i, link_info)))
+            
+            # Save in frontier order so results match a serial crawl
+            for link_info, future in futures:
+                self.save_result(link_info, future, depth)
+                saved += 1
+        except BaseException:
+            # Don't wait for queued fetches on Ctrl+C; drop them, but keep the
+            # pages already fetched so --resume doesn't download them again
+            executor.shutdown(wait=False, cancel_futures=True)
+            for link_info, future in futures[saved:]:
+                if future.done() and not future.cancelled():
+                    self.save_result(link_info, future, depth)
+            raise
+        executor.shutdown()
+    
+    def save_result(self, link_info, future, depth):
+        """Save one finished page, record its failure, or carry its previous copy over"""
+        url = link_info['url']
+        try:
+            page, cache_entry, links = future.result()
         except Exception as e:
-            print(f"Error fetching main page: {e}")
+            print(f"Error scraping {url}: {e}")
+            self.record_failure(url, e)
+            self.carry_over_archived_page(link_info['filename'])
+            self.checkpoint_if_due()
             return
         
-        # Extract all documentation links
-        self.doc_links = self.extract_sidebar_links(main_page_content)
-        print(f"Found {len(self.doc_links)} documentation links")
+        # Queue links as each page lands so a checkpoint never loses them
+        for link in links:
+            self.queue_link(link['url'], link['title'], depth + 1)
         
-        # Create index file
-        self.create_index_file()
+        if page is NOT_MODIFIED:
+            print(f"Not modified: {url}")
+            self.count('not_modified')
+            self.carry_over_archived_page(link_info['filename'])
+            self.scraped_urls.add(url)
+        elif page:
+            with self.metrics.stage(url, 'write'):
+                if page['html'] is not None and self.archive_writer:
+                    self.save_to_archive(page['html'], link_info['filename'], link_info['title'], url)
+                elif page['html'] is not None:
+                    self.save_page_content(page['html'], link_info['filename'], link_info['title'], url)
+                if page['text'] is not None:
+                    self.save_text_content(page['text'], link_info['filename'])
+            self.scraped_urls.add(url)
+        else:
+            print(f"No content found for: {url}")
+            self.checkpoint_if_due()
+            return
         
-        # Scrape each documentation page
-        for i, link_info in enumerate(self.doc_links, 1):
-            url = link_info['url']
-            title = link_info['title']
+        self.failed_urls.pop(url, None)
+        if self.cache and cache_entry:
+            self.cache.update(url, cache_entry)
+        self.checkpoint_if_due()
+    
+    def create_combined_text_file(self):
+        """Build the combined text reference from the pages scraped in this run"""
+        outputs = {}
+        for link_info in self.doc_links:
             filename = link_info['filename']
-            
-            if url in self.scraped_urls:
-                print(f"Skipping already scraped: {url}")
-                continue
-            
-            print(f"[{i}/{len(self.doc_links)}] Scraping: {title} ({url})")
-            
-            try:
-                response = requests.get(url, timeout=10)
-                response.raise_for_status()
-                page_content = response.text
-                
-                article_content = self.extract_article_content(page_content, url)
-                
-                if article_content:
-                    self.save_page_content(article_content, filename, title, url)
-                    self.scraped_urls.add(url)
-                else:
-                    print(f"No content found for: {url}")
-                
-                # Be respectful - small delay between requests
-                time.sleep(1)
-                
-            except Exception as e:
-                print(f"Error scraping {url}: {e}")
-                continue
+            if link_info['url'] in self.scraped_urls and (self.converter.output_dir / f"{filename}.txt").exists():
+                outputs[f"{filename}.html"] = {'output': f"{filename}.txt"}
         
-        print(f"\nScraping complete! Scraped {len(self.scraped_urls)} pages.")
-        print(f"Files saved to: {self.output_dir.absolute()}")
+        html_files = [self.output_dir / name for name in outputs]
+        self.converter.create_combined_file(html_files, outputs)
+        self.converter.writer.close()
     
     def create_index_file(self):
         """Create an index HTML file with links to all scraped docs"""
-        index_content = """<!DOCTYPE html>
+        saved_links = [
+            link_info for link_info in self.doc_links
+            if link_info['url'] in self.scraped_urls and (self.output_dir / f"{link_info['filename']}.html").exists()
+        ]
+        index_path = self.output_dir / "index.html"
+        self.writer.write(index_path, self.index_chunks(saved_links))
+        
+        print(f"Created index file: {index_path}")
+    
+    def index_chunks(self, saved_links):
+        """Render the index page piece by piece instead of building it in one string"""
+        yield """<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
@@ -301,38 +1008,115 @@ class KonvaJSDocScraper:
     <div class="meta">
         <strong>Source:</strong> <a href="https://konvajs.org/docs/" target="_blank">https://konvajs.org/docs/</a><br>
         <strong>Scraped:</strong> """ + time.strftime('%Y-%m-%d %H:%M:%S') + f"""<br>
-        <strong>Total Pages:</strong> {len(self.doc_links)}
+        <strong>Total Pages:</strong> {len(saved_links)}
     </div>
     
     <h2>Documentation Pages</h2>
     <ul class="doc-list">
 """
         
-        for link_info in self.doc_links:
+        for link_info in saved_links:
             filename = link_info['filename']
             title = link_info['title']
             url = link_info['url']
             
-            index_content += f"""        <li>
+            yield f"""        <li>
             <a href="{filename}.html">{title}</a>
             <br><small>Source: <a href="{url}" target="_blank">{url}</a></small>
         </li>
 """
         
-        index_content += """    </ul>
+        yield """    </ul>
 </body>
 </html>"""
-        
-        index_path = self.output_dir / "index.html"
-        with open(index_path, 'w', encoding='utf-8') as f:
-            f.write(index_content)
-        
-        print(f"Created index file: {index_path}")
 
 
 def main():
     """Main function to run the scraper"""
-    scraper = KonvaJSDocScraper()
+    parser = argparse.ArgumentParser(description="Scrape the KonvaJS documentation")
+    parser.add_argument("--base-url", default="https://konvajs.org/docs/",
+                        help="Docs landing page that holds the sidebar")
+    parser.add_argument("--output-dir", default="konva_docs",
+                        help="Directory to save the scraped pages to")
+    parser.add_argument("--workers", type=int, default=4,
+                        help="Number of concurrent fetch workers")
+    parser.add_argument("--rate", type=float, default=1.0,
+                        help="Requests per second allowed per host (0 disables the limit)")
+    parser.add_argument("--burst", type=int, default=1,
+                        help="Requests a host may receive back to back before throttling")
+    parser.add_argument("--pool-size", type=int, default=None,
+                        help="Keep-alive connections per host (defaults to max(workers, 10))")
+    parser.add_argument("--retries", type=int, default=3,
+                        help="Retries for timeouts and 5xx responses")
+    parser.add_argument("--backoff", type=float, default=0.5,
+                        help="Base delay in seconds for exponential retry backoff")
+    parser.add_argument("--timeout", type=float, default=10,
+                        help="Per-request timeout in seconds")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Ignore the conditional-GET cache and refetch every page")
+    parser.add_argument("--parser", default="auto", choices=["auto"] + PARSER_PREFERENCE,
+                        help="HTML parser backend (auto picks the fastest installed)")
+    parser.add_argument("--text-dir", default=None,
+                        help="Also convert each article to text in this directory as it is scraped")
+    parser.add_argument("--no-html", action="store_true",
+                        help="With --text-dir, skip writing the intermediate HTML pages")
+    parser.add_argument("--max-depth", type=int, default=0,
+                        help="Follow in-docs links this many levels beyond the sidebar pages (0 scrapes the sidebar only)")
+    parser.add_argument("--sitemap", action="store_true",
+                        help="Also seed the crawl from the site's sitemap.xml")
+    parser.add_argument("--resume", action="store_true",
+                        help="Continue an interrupted crawl from its last checkpoint in the output directory")
+    parser.add_argument("--mirror-assets", action="store_true",
+                        help="Download article images into assets/ and point the saved HTML at the local copies")
+    parser.add_argument("--asset-budget", type=float, default=None,
+                        help="With --mirror-assets, stop mirroring once the images reach this many megabytes")
+    parser.add_argument("--stream", action="store_true",
+                        help="Parse pages while they download instead of buffering them, keeping memory flat on huge pages")
+    parser.add_argument("--max-page-mb", type=float, default=None,
+                        help="With --stream, stop reading a page after this many megabytes and report it as truncated")
+    parser.add_argument("--archive", default=None,
+                        help="Store pages in this compressed archive file instead of loose HTML files")
+    parser.add_argument("--archive-codec", default="auto", choices=["auto", "zstd", "gzip"],
+                        help="Archive compression (auto uses zstd when zstandard is installed)")
+    parser.add_argument("--metrics", default=None,
+                        help="Where to write the JSON run summary (defaults to crawl_metrics.json in the output directory)")
+    parser.add_argument("--profile", default=None, choices=PROFILE_MODES,
+                        help="Profile the crawl with cProfile or tracemalloc")
+    parser.add_argument("--profile-output", default=None,
+                        help="File to save the raw profile or allocation report to")
+    args = parser.parse_args()
+    if args.rate < 0:
+        parser.error("--rate must be 0 or more")
+    if args.burst < 1:
+        parser.error("--burst must be at least 1")
+    
+    scraper = KonvaJSDocScraper(
+        base_url=args.base_url,
+        output_dir=args.output_dir,
+        workers=args.workers,
+        requests_per_second=args.rate,
+        burst=args.burst,
+        pool_size=args.pool_size,
+        max_retries=args.retries,
+        backoff_factor=args.backoff,
+        timeout=args.timeout,
+        use_cache=not args.no_cache,
+        parser=args.parser,
+        text_dir=args.text_dir,
+        save_html=not args.no_html,
+        metrics_path=args.metrics,
+        profile=args.profile,
+        profile_output=args.profile_output,
+        archive_path=args.archive,
+        archive_codec=args.archive_codec,
+        max_depth=args.max_depth,
+        use_sitemap=args.sitemap,
+        resume=args.resume,
+        mirror_assets=args.mirror_assets,
+        asset_budget=int(args.asset_budget * 1024 * 1024) if args.asset_budget is not None else None,
+        stream=args.stream,
+        max_page_bytes=int(args.max_page_mb * 1024 * 1024) if args.max_page_mb is not None else None,
+    )
     scraper.scrape_docs()
 
 
@@ -0,0 +1,68 @@
+"""Tests for heading-aligned chunking of converted pages"""
+
+from html_to_text import HTMLToTextConverter
+from parser_backend import make_soup
+from doc_chunks import DocChunker
+
+# The saved-page layout; body is not a container tag, so its text is flattened
+SAVED_PAGE = (
+    '<html><head><title>Shapes</title></head><body>'
+    '<div class="source-url"><a href="https://konvajs.org/docs/shapes.html">src</a></div>'
+    '<article><h1>Shapes</h1><p>Intro to shapes.</p>'
+    '<h2>Rect</h2><p>Draw a Rect.</p>'
+    '<h3>Corner radius</h3><p>Round the corners.</p>'
+    '<h2>Circle</h2><p>Draw a Circle.</p></article></body></html>'
+)
+
+
+def convert(tmp_path):
+    converter = HTMLToTextConverter(input_dir=tmp_path, output_dir=tmp_path / "text", parser="html.parser")
+    headings = []
+    text = converter.convert_soup(make_soup(SAVED_PAGE, "html.parser"), {}, headings)
+    return text, headings
+
+
+def test_flattened_page_is_split_at_the_tree_headings(tmp_path):
+    text, headings = convert(tmp_path)
+    assert "\n## Rect" not in text
+    assert headings == [[1, "Shapes"], [2, "Rect"], [3, "Corner radius"], [2, "Circle"]]
+
+    chunks = list(DocChunker().chunk_document(text, "shapes.txt", headings))
+    assert [(chunk['heading_path'], chunk['text']) for chunk in chunks] == [
+        (["Shapes"], "ShapesIntro to shapes."),
+        (["Shapes", "Rect"], "RectDraw a Rect."),
+        (["Shapes", "Rect", "Corner radius"], "Corner radiusRound the corners."),
+        (["Shapes", "Circle"], "CircleDraw a Circle."),
+    ]
+    assert all(chunk['url'] == "https://konvajs.org/docs/shapes.html" for chunk in chunks)
+
+
+def test_outline_cuts_before_heading_markers():
+    body = "Preface\n\n# Guide\n\nText\n\n## Step\n\nMore"
+    sections = list(DocChunker().sections(body, [[1, "Guide"], [2, "Step"]]))
+    assert sections == list(DocChunker().sections(body))
+    assert sections[1] == (["Guide"], "# Guide\n\nText")
+
+
+def test_heading_path_follows_levels_when_the_page_starts_at_h2():
+    body = (
+        "## Install​\n\nnpm i konva\n\n"
+        "### Node\n\nUse canvas.\n\n### Deno\n\nUse npm: specifiers.\n\n"
+        "## Styles​\n\nFill and stroke."
+    )
+    headings = [[2, "Install​"], [3, "Node"], [3, "Deno"], [2, "Styles​"]]
+    expected = [["Install"], ["Install", "Node"], ["Install", "Deno"], ["Styles"]]
+
+    assert [path for path, _ in DocChunker().sections(body)] == expected
+    assert [path for path, _ in DocChunker().sections(body, headings)] == expected
+
+    flattened = "Install​npm i konvaNodeUse canvas.DenoUse npm: specifiers.Styles​Fill and stroke."
+    assert [path for path, _ in DocChunker().sections(flattened, headings)] == expected
+
+
+def test_heading_lines_are_not_cut_at_a_mention_in_prose():
+    body = "# Shapes\n\nEvery Rect is a shape.\n\n## Rect\n\nDraw one."
+    assert list(DocChunker().sections(body, [[1, "Shapes"], [2, "Rect"]])) == [
+        (["Shapes"], "# Shapes\n\nEvery Rect is a shape."),
+        (["Shapes", "Rect"], "## Rect\n\nDraw one."),
+    ]
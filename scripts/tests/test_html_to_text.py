@@ -0,0 +1,70 @@
+"""Tests for the HTML to text converter: parallel runs and the golden corpus"""
+
+import json
+import shutil
+
+import pytest
+
+from conftest import REPO_ROOT
+from html_to_text import HTMLToTextConverter
+from parser_backend import PARSER_PREFERENCE, available_parsers
+
+CORPUS_DIR = REPO_ROOT / "external_context" / "konva_docs" / "html"
+GOLDEN_DIR = REPO_ROOT / "external_context" / "konva_docs_text"
+PAGES = ["clipping.html", "events.html", "filters.html", "tweens.html"]
+
+
+def copy_pages(input_dir):
+    input_dir.mkdir()
+    for name in PAGES:
+        shutil.copy(CORPUS_DIR / name, input_dir / name)
+
+
+def convert(input_dir, output_dir, jobs=1, parser="html.parser", chunk_tokens=None):
+    converter = HTMLToTextConverter(input_dir=input_dir, output_dir=output_dir, jobs=jobs, parser=parser,
+                                    chunk_tokens=chunk_tokens)
+    converter.convert_all_files()
+    return {path.name: path.read_bytes() for path in output_dir.glob("*.txt")}
+
+
+def test_parallel_conversion_matches_serial_and_survives_a_bad_page(tmp_path):
+    input_dir = tmp_path / "html"
+    copy_pages(input_dir)
+    # Not UTF-8, so reading it fails inside the worker
+    (input_dir / "broken.html").write_bytes(b"<html><body>\xff\xfe broken</body></html>")
+
+    serial = convert(input_dir, tmp_path / "serial", jobs=1)
+    parallel = convert(input_dir, tmp_path / "parallel", jobs=2)
+
+    assert parallel == serial
+    assert "broken.txt" not in serial
+    assert {name.replace(".html", ".txt") for name in PAGES} <= serial.keys()
+    assert b"Clipping" in serial["konvajs_complete_docs.txt"]
+
+
+@pytest.mark.parametrize("parser", PARSER_PREFERENCE)
+def test_every_parser_reproduces_the_golden_corpus(tmp_path, parser):
+    if parser not in available_parsers():
+        pytest.skip(f"{parser} is not installed")
+
+    outputs = convert(CORPUS_DIR, tmp_path / "text", parser=parser)
+
+    golden = {path.name: path.read_bytes() for path in GOLDEN_DIR.glob("*.txt")}
+    assert sorted(outputs) == sorted(golden)
+    for name, content in golden.items():
+        assert outputs[name] == content, f"{name} differs from the golden output with {parser}"
+
+
+def test_changing_the_chunk_budget_rebuilds_unchanged_pages(tmp_path):
+    input_dir = tmp_path / "html"
+    copy_pages(input_dir)
+    index_path = tmp_path / "text" / "konvajs_chunks.index.json"
+
+    convert(input_dir, tmp_path / "text", chunk_tokens=512)
+    large = json.loads(index_path.read_text(encoding='utf-8'))
+    convert(input_dir, tmp_path / "text", chunk_tokens=128)
+    small = json.loads(index_path.read_text(encoding='utf-8'))
+
+    assert small['max_tokens'] == 128
+    assert len(small['chunks']) > len(large['chunks'])
+    assert all(entry['tokens'] <= 128 for entry in small['chunks'])
@@ -0,0 +1,153 @@
+"""Tests for the KonvaJS docs scraper: article extraction and the fetch engine"""
+
+import re
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+from benchmark_pipeline import StandInServer, sidebar_page
+from parser_backend import available_parsers
+from scrape_konvajs import KonvaJSDocScraper, main
+
+MARKDOWN_ONLY_PAGE = '<html><body><div class="markdown"><p>Only markdown</p></div></body></html>'
+ARTICLE_PAGE = (
+    '<html><body><article><h1>T</h1>'
+    '<div class="markdown"><p>inside markdown</p></div>'
+    '<p>outside markdown</p></article></body></html>'
+)
+
+
+def make_scraper(output_dir, parser):
+    output_dir.mkdir(parents=True, exist_ok=True)
+    return KonvaJSDocScraper(base_url="http://docs.test/docs/", output_dir=output_dir, parser=parser)
+
+
+@pytest.mark.parametrize("parser", available_parsers())
+def test_article_beats_a_memoized_lower_priority_selector(tmp_path, parser):
+    scraper = make_scraper(tmp_path, parser)
+    assert scraper.locate_article(MARKDOWN_ONLY_PAGE, "http://docs.test/docs/a.html").name == 'div'
+
+    article = scraper.locate_article(ARTICLE_PAGE, "http://docs.test/docs/b.html")
+    assert article.name == 'article'
+    assert "outside markdown" in article.get_text()
+
+
+@pytest.mark.parametrize("parser", available_parsers())
+def test_extraction_does_not_depend_on_page_order(tmp_path, parser):
+    pages = [
+        ("http://docs.test/docs/a.html", MARKDOWN_ONLY_PAGE),
+        ("http://docs.test/docs/b.html", ARTICLE_PAGE),
+        ("http://docs.test/docs/c.html", '<html><body><div class="markdown x">classes</div></body></html>'),
+    ]
+    forward = make_scraper(tmp_path / "forward", parser)
+    backward = make_scraper(tmp_path / "backward", parser)
+    extracted = {url: str(forward.locate_article(html, url)) for url, html in pages}
+    for url, html in reversed(pages):
+        assert str(backward.locate_article(html, url)) == extracted[url]
+
+
+# Deliberately not in alphabetical order, so sorting cannot pass for frontier order
+PAGE_NAMES = ["tweens", "shapes", "events", "filters", "clipping", "animations"]
+
+
+def docs_page(name):
+    return f"<html><head><title>{name}</title></head><body><article><h1>{name}</h1><p>About {name}.</p></article></body></html>"
+
+
+def docs_site(pages):
+    site = {f"/docs/{name}.html": page for name, page in pages.items()}
+    site["/docs/"] = sidebar_page(pages)
+    return site
+
+
+def crawl(server, output_dir, **options):
+    options = {'workers': 4, 'requests_per_second': 0, 'use_cache': False, 'parser': "html.parser", **options}
+    output_dir.mkdir(parents=True, exist_ok=True)
+    scraper = KonvaJSDocScraper(base_url=server.base_url, output_dir=output_dir, **options)
+    scraper.scrape_docs()
+    return scraper
+
+
+def test_concurrent_crawl_saves_pages_in_sidebar_order(tmp_path):
+    def slow_page(name, delay):
+        def respond(headers):
+            time.sleep(delay)
+            return 200, {}, docs_page(name)
+        return respond
+
+    # Earlier pages answer later, so they finish in reverse order
+    delays = {name: 0.05 * (len(PAGE_NAMES) - i) for i, name in enumerate(PAGE_NAMES)}
+    with StandInServer(docs_site({name: slow_page(name, delays[name]) for name in PAGE_NAMES})) as server:
+        scraper = crawl(server, tmp_path / "docs", workers=4)
+
+    saved = [Path(path).name for path in scraper.changed_files]
+    assert saved[:len(PAGE_NAMES)] == [f"{name}.html" for name in PAGE_NAMES]
+    for name in PAGE_NAMES:
+        assert f"About {name}." in (tmp_path / "docs" / f"{name}.html").read_text(encoding='utf-8')
+
+    index = (tmp_path / "docs" / "index.html").read_text(encoding='utf-8')
+    assert re.findall(r'href="([\w-]+)\.html"', index) == PAGE_NAMES
+
+
+def test_per_host_rate_limit_is_respected(tmp_path):
+    rate = 5
+    with StandInServer(docs_site({name: docs_page(name) for name in PAGE_NAMES})) as server:
+        crawl(server, tmp_path / "docs", workers=4, requests_per_second=rate, burst=1)
+        times = sorted(when for when, _, _ in server.requests)
+
+    assert len(times) == len(PAGE_NAMES) + 1
+    # One token per 1/rate seconds; allow for scheduling jitter on each gap
+    assert all(later - earlier >= 0.8 / rate for earlier, later in zip(times, times[1:]))
+    assert times[-1] - times[0] >= 0.95 * (len(times) - 1) / rate
+
+
+def test_server_errors_are_retried(tmp_path):
+    attempts = []
+
+    def flaky(headers):
+        attempts.append(headers)
+        if len(attempts) == 1:
+            return 503, {}, "busy"
+        return 200, {}, docs_page("events")
+
+    pages = {name: docs_page(name) for name in PAGE_NAMES}
+    pages["events"] = flaky
+    with StandInServer(docs_site(pages)) as server:
+        scraper = crawl(server, tmp_path / "docs", backoff_factor=0.01)
+
+    assert len(attempts) == 2
+    assert scraper.stats['retries'] == 1
+    assert scraper.stats['failures'] == 0
+    assert "About events." in (tmp_path / "docs" / "events.html").read_text(encoding='utf-8')
+
+
+def test_unchanged_pages_are_not_saved_again(tmp_path):
+    def validated(name):
+        def respond(headers):
+            if headers.get('If-None-Match') == f'"{name}-v1"':
+                return 304, {}, ""
+            return 200, {'ETag': f'"{name}-v1"'}, docs_page(name)
+        return respond
+
+    # Pages with an ETag answer 304; the rest are recognised by their body hash
+    pages = {name: validated(name) if i % 2 else docs_page(name) for i, name in enumerate(PAGE_NAMES)}
+    with StandInServer(docs_site(pages)) as server:
+        first = crawl(server, tmp_path / "docs", use_cache=True)
+        second = crawl(server, tmp_path / "docs", use_cache=True)
+        validators = [headers.get('If-None-Match') for _, path, headers in server.requests if path == "/docs/shapes.html"]
+
+    assert first.stats['not_modified'] == 0
+    assert second.stats['not_modified'] == len(PAGE_NAMES)
+    assert validators == [None, '"shapes-v1"']
+    assert not any(str(path).endswith(f"{name}.html") for path in second.changed_files for name in PAGE_NAMES)
+    assert sorted(second.scraped_urls) == sorted(f"{server.base_url}{name}.html" for name in PAGE_NAMES)
+
+
+@pytest.mark.parametrize("option", [["--burst", "0"], ["--rate", "-1"]])
+def test_limits_that_would_block_forever_are_rejected(monkeypatch, option):
+    monkeypatch.setattr(sys, 'argv', ["scrape_konvajs.py", *option])
+    with pytest.raises(SystemExit) as exit_info:
+        main()
+    assert exit_info.value.code == 2